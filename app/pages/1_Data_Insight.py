@@ -9,6 +9,8 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 
+from utils.charts import cached_chart, class_bar_figure
+
 st.set_page_config(
     page_title="Data Insights",
     page_icon="",
@@ -43,26 +45,28 @@ col1, col2 = st.columns([2, 1])
 
 with col1:
     # Class distribution pie chart
-    labels = ['Normal Transactions', 'Money Laundering']
-    values = [31863008, 35230]
-    colors = ['#3b82f6', '#dc2626']
-    
-    fig = go.Figure(data=[go.Pie(
-        labels=labels,
-        values=values,
-        hole=0.4,
-        marker=dict(colors=colors),
-        textinfo='label+percent',
-        textfont_size=14
-    )])
-    
-    fig.update_layout(
-        title="Severe Class Imbalance (Only 0.11% Laundering)",
-        height=400,
-        showlegend=True
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    def build_class_distribution():
+        labels = ['Normal Transactions', 'Money Laundering']
+        values = [31863008, 35230]
+        colors = ['#3b82f6', '#dc2626']
+
+        fig = go.Figure(data=[go.Pie(
+            labels=labels,
+            values=values,
+            hole=0.4,
+            marker=dict(colors=colors),
+            textinfo='label+percent',
+            textfont_size=14
+        )])
+
+        fig.update_layout(
+            title="Severe Class Imbalance (Only 0.11% Laundering)",
+            height=400,
+            showlegend=True
+        )
+        return fig
+
+    st.plotly_chart(cached_chart('eda_class_distribution', build_class_distribution), use_container_width=True)
 
 with col2:
     st.markdown("#### The Challenge")
@@ -90,37 +94,16 @@ with col1:
     payment_formats = ['ACH', 'Wire', 'Check', 'Cash', 'Bitcoin']
     normal_pct = [84.2, 8.5, 4.3, 2.1, 0.9]
     laundering_pct = [95.8, 2.1, 1.2, 0.7, 0.2]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name='Normal',
-        x=payment_formats,
-        y=normal_pct,
-        marker_color='#3b82f6',
-        text=[f'{v}%' for v in normal_pct],
-        textposition='outside'
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='Laundering',
-        x=payment_formats,
-        y=laundering_pct,
-        marker_color='#dc2626',
-        text=[f'{v}%' for v in laundering_pct],
-        textposition='outside'
-    ))
-    
-    fig.update_layout(
-        title="Payment Format by Transaction Type",
-        xaxis_title="Payment Format",
-        yaxis_title="Percentage (%)",
-        barmode='group',
-        height=400,
-        yaxis_range=[0, 110]
+
+    st.plotly_chart(
+        cached_chart('eda_payment_format', lambda: class_bar_figure(
+            payment_formats, normal_pct, laundering_pct,
+            title="Payment Format by Transaction Type",
+            xaxis_title="Payment Format",
+            yaxis_range=[0, 110]
+        )),
+        use_container_width=True
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
 
 with col2:
     st.markdown("#### Key Finding")
@@ -149,37 +132,16 @@ with col1:
     days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
     normal_daily = [15.2, 15.5, 15.8, 15.3, 15.1, 11.8, 11.3]
     laundering_daily = [14.8, 14.5, 14.2, 14.9, 15.2, 13.5, 12.9]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name='Normal',
-        x=days,
-        y=normal_daily,
-        marker_color='#3b82f6',
-        text=[f'{v}%' for v in normal_daily],
-        textposition='outside'
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='Laundering',
-        x=days,
-        y=laundering_daily,
-        marker_color='#dc2626',
-        text=[f'{v}%' for v in laundering_daily],
-        textposition='outside'
-    ))
-    
-    fig.update_layout(
-        title="Transaction Distribution by Day of Week",
-        xaxis_title="Day of Week",
-        yaxis_title="Percentage (%)",
-        barmode='group',
-        height=400,
-        yaxis_range=[0, 20]
+
+    st.plotly_chart(
+        cached_chart('eda_day_of_week', lambda: class_bar_figure(
+            days, normal_daily, laundering_daily,
+            title="Transaction Distribution by Day of Week",
+            xaxis_title="Day of Week",
+            yaxis_range=[0, 20]
+        )),
+        use_container_width=True
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
 
 with col2:
     st.markdown("#### Weekend Pattern")
@@ -207,37 +169,16 @@ with col1:
     amount_ranges = ['$0-1K', '$1K-5K', '$5K-9K', '$9K-10K', '$10K-50K', '$50K+']
     normal_amounts = [35.2, 28.5, 15.3, 2.1, 12.8, 6.1]
     laundering_amounts = [18.5, 22.3, 28.5, 18.2, 8.5, 4.0]
-    
-    fig = go.Figure()
-    
-    fig.add_trace(go.Bar(
-        name='Normal',
-        x=amount_ranges,
-        y=normal_amounts,
-        marker_color='#3b82f6',
-        text=[f'{v}%' for v in normal_amounts],
-        textposition='outside'
-    ))
-    
-    fig.add_trace(go.Bar(
-        name='Laundering',
-        x=amount_ranges,
-        y=laundering_amounts,
-        marker_color='#dc2626',
-        text=[f'{v}%' for v in laundering_amounts],
-        textposition='outside'
-    ))
-    
-    fig.update_layout(
-        title="Transaction Amount Distribution",
-        xaxis_title="Amount Range",
-        yaxis_title="Percentage (%)",
-        barmode='group',
-        height=400,
-        yaxis_range=[0, 40]
+
+    st.plotly_chart(
+        cached_chart('eda_amount_ranges', lambda: class_bar_figure(
+            amount_ranges, normal_amounts, laundering_amounts,
+            title="Transaction Amount Distribution",
+            xaxis_title="Amount Range",
+            yaxis_range=[0, 40]
+        )),
+        use_container_width=True
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
 
 with col2:
     st.markdown("#### Structuring Detection")
@@ -5,11 +5,15 @@ Score individual transactions and identify risk factors.
 """
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 import joblib
 import json
 
+from utils.artifacts import find_models_dir
+from utils.batch import TransactionBatch
+from utils.cases import CaseBuilder
+from utils.risk_tables import HIGH_RISK_MULTIPLIER, RiskLookup
+from utils.shadow import ShadowScorer
+
 st.set_page_config(
     page_title="AML Prediction",
     page_icon="",
@@ -29,14 +33,32 @@ def load_model():
                 features = json.load(f)
             with open(os.path.join(base, 'model_config.json'), 'r') as f:
                 config = json.load(f)
-            return model, scaler, features, config
+            # champion plus any challenger_*.pkl models scored in shadow mode
+            scorer = ShadowScorer.from_directory(base, threshold=config['optimal_threshold'], champion=model)
+            return model, scaler, features, config, scorer
     raise FileNotFoundError("Model files not found")
 
-model, scaler, feature_names, config = load_model()
+# Bank and currency-pair risk tables (optional artifact)
+@st.cache_resource
+def load_risk_tables():
+    try:
+        return RiskLookup.load(find_models_dir('risk_tables_serving.npz'))
+    except FileNotFoundError:
+        return None
+
+model, scaler, feature_names, config, scorer = load_model()
+risk_tables = load_risk_tables()
 
 if 'prediction_history' not in st.session_state:
     st.session_state.prediction_history = []
 
+# per-session feature buffer, reused for every scored transaction
+if 'transaction_batch' not in st.session_state:
+    st.session_state.transaction_batch = TransactionBatch(feature_names, capacity=1, scaler=scaler)
+
+if 'case_builder' not in st.session_state:
+    st.session_state.case_builder = CaseBuilder(window='3D')
+
 st.title(" Transaction Monitoring")
 st.markdown("**Real-time transaction risk scoring and case investigation for compliance team**")
 
@@ -94,68 +116,33 @@ if st.button(" Score Transaction", type="primary", use_container_width=True):
     st.markdown("---")
     st.markdown("###  Risk Assessment Results")
     
-    # Extract temporal features from datetime
-    hour = transaction_time.hour
-    day_of_week = transaction_date.weekday()  # 0=Monday, 6=Sunday
-    is_weekend = 1 if day_of_week >= 5 else 0
-    is_night = 1 if hour >= 22 or hour < 6 else 0
-    
-    # features
-    is_ach = 1 if payment_format == "ACH" else 0
-    is_usd = 1 if payment_currency == "US Dollar" else 0
-    is_euro = 1 if payment_currency == "Euro" else 0
-    is_uk_pound = 1 if payment_currency == "UK Pound" else 0
-    is_bank_800 = 1 if receiver_bank == 800 or sender_bank == 800 else 0
-    is_bank_1004 = 1 if receiver_bank == 1004 or sender_bank == 1004 else 0
-    in_structuring_range = 1 if 9000 <= amount <= 10000 else 0
-    is_just_below_threshold = 1 if 9500 <= amount < 10000 else 0
-    ach_weekend = is_ach * is_weekend
-    uk_pound_structuring = is_uk_pound * in_structuring_range
-    mean_amount = 5000  # Average transaction amount
-    std_amount = 3000   # Standard deviation
-    amount_zscore = (amount - mean_amount) / std_amount
-    
-    # Risk score v2: composite risk indicator
-    risk_score_v2 = (
-        is_ach * 3.0 +
-        is_weekend * 1.5 +
-        in_structuring_range * 4.0 +
-        is_bank_1004 * 5.0 +
-        is_uk_pound * 2.0
+    # Features are computed straight into the session's float32 batch
+    batch = st.session_state.transaction_batch
+    batch.featurize({
+        'Timestamp': [datetime.combine(transaction_date, transaction_time)],
+        'From Bank': [sender_bank],
+        'To Bank': [receiver_bank],
+        'Amount Paid': [amount],
+        'Payment Currency': [payment_currency],
+        'Payment Format': [payment_format]
+    })
+
+    # indicators shown to the analyst, read before scaling overwrites the batch
+    is_ach, is_weekend, in_structuring_range, is_uk_pound, is_bank_1004 = (
+        int(batch.column(name)[0])
+        for name in ('is_ach', 'is_weekend', 'in_structuring_range', 'is_uk_pound', 'is_bank_1004')
     )
-    
-    # Prepare input data using exact feature names from training
-    input_dict = {
-        'To Bank': receiver_bank,
-        'From Bank': sender_bank,
-        'Amount Received': amount,
-        'Amount Paid': amount,
-        'hour': hour,
-        'day_of_week': day_of_week,
-        'is_weekend': is_weekend,
-        'is_night': is_night,
-        'is_ach': is_ach,
-        'is_usd': is_usd,
-        'is_euro': is_euro,
-        'is_uk_pound': is_uk_pound,
-        'is_bank_800': is_bank_800,
-        'is_bank_1004': is_bank_1004,
-        'in_structuring_range': in_structuring_range,
-        'is_just_below_threshold': is_just_below_threshold,
-        'ach_weekend': ach_weekend,
-        'uk_pound_structuring': uk_pound_structuring,
-        'amount_zscore': amount_zscore,
-        'risk_score_v2': risk_score_v2
-    }
-    
-    # features dataframe
-    input_data = pd.DataFrame([input_dict], columns=feature_names)
-    
-    # Scale features
-    input_scaled = scaler.transform(input_data)
-    
-    # prediction
-    risk_probability = model.predict_proba(input_scaled)[0][1]
+    # institution risk from the bank risk tables when available
+    high_risk_institution = is_bank_1004
+    if risk_tables is not None:
+        bank_multiplier = max(
+            risk_tables.multiplier('from_bank', [sender_bank])[0],
+            risk_tables.multiplier('to_bank', [receiver_bank])[0]
+        )
+        high_risk_institution = 1 if bank_multiplier >= HIGH_RISK_MULTIPLIER else 0
+
+    # prediction (challenger models, if any, are scored in the background)
+    risk_probability = batch.transform().predict(scorer.score)[0]
     threshold = config['optimal_threshold']
     prediction = 1 if risk_probability >= threshold else 0
     
@@ -171,6 +158,16 @@ if st.button(" Score Transaction", type="primary", use_container_width=True):
         'Status': 'HIGH RISK' if prediction == 1 else 'LOW RISK'
     }
     st.session_state.prediction_history.append(prediction_record)
+
+    # Flagged transactions feed the account-level case queue
+    if prediction == 1:
+        st.session_state.case_builder.add_alert(
+            f"{transaction_date} {transaction_time}",
+            sender_account,
+            receiver_account,
+            risk_probability,
+            amount
+        )
  
     # Display metrics
     col1, col2, col3 = st.columns(3)
@@ -239,7 +236,7 @@ Risk Score: **{risk_probability*100:.2f}%** (Below 10% threshold)
                 risk_factors.append("Weekend transaction")
             if in_structuring_range:
                 risk_factors.append("Structuring pattern ($9K-$10K)")
-            if is_bank_1004:
+            if high_risk_institution:
                 risk_factors.append("High-risk institution")
             if is_uk_pound and in_structuring_range:
                 risk_factors.append("Currency risk pattern")
@@ -251,4 +248,29 @@ Risk Score: **{risk_probability*100:.2f}%** (Below 10% threshold)
                 st.info("Multiple minor risk signals detected")
         else:
             st.success("Transaction cleared")
-            st.info("No suspicious patterns detected")
\ No newline at end of file
+            st.info("No suspicious patterns detected")
+
+# Case Queue
+case_builder = st.session_state.case_builder
+if len(case_builder) > 0:
+    st.markdown("---")
+    st.markdown("### Case Queue")
+    st.markdown("Flagged transactions grouped by sender account within a 3-day window (receivers are counterparties), ranked by risk")
+
+    cases = case_builder.to_frame(top=500)
+    cases['Max Score'] = (cases['Max Score'] * 100).round(2)
+    cases['Mean Score'] = (cases['Mean Score'] * 100).round(2)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Open Cases", f"{len(case_builder):,}")
+    with col2:
+        st.metric("Alerts", f"{case_builder.n_alerts:,}")
+    with col3:
+        st.metric("Highest Risk", f"{cases['Max Score'].iloc[0]:.2f}%")
+
+    st.dataframe(
+        cases.rename(columns={'Max Score': 'Max Score (%)', 'Mean Score': 'Mean Score (%)'}),
+        hide_index=True,
+        use_container_width=True
+    )
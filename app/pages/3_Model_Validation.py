@@ -7,6 +7,14 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import json
+import os
+
+from utils.artifacts import artifact_version, find_models_dir, model_version
+from utils.backtest import RESULTS_FILE
+from utils.charts import (
+    TEST_SCORES_FILE, cached_chart, curve_points, histogram_figure,
+    load_test_scores, pr_figure, roc_figure, score_histogram
+)
 
 st.set_page_config(
     page_title="Model Validation",
@@ -25,8 +33,34 @@ def load_config():
                 return json.load(f)
     raise FileNotFoundError("model_config.json not found")
 
+# Load walk-forward backtest results (optional artifact); `file_version` changes when the file does
+@st.cache_data
+def load_walk_forward(models_dir, file_version):
+    path = os.path.join(models_dir, RESULTS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Test-set scores (optional artifact), reduced to histogram bins and curve points;
+# `file_version` changes when the scores file does
+@st.cache_data
+def load_score_aggregates(models_dir, file_version):
+    if not os.path.exists(os.path.join(models_dir, TEST_SCORES_FILE)):
+        return None
+    y_true, scores = load_test_scores(models_dir)
+    return score_histogram(scores, y_true), curve_points(y_true, scores)
+
 config = load_config()
 
+# charts are cached per model version, so retraining invalidates them
+models_dir = find_models_dir()
+version = model_version(models_dir)
+walk_forward_version = artifact_version(models_dir, [RESULTS_FILE])
+walk_forward = load_walk_forward(models_dir, walk_forward_version)
+scores_version = artifact_version(models_dir, [TEST_SCORES_FILE])
+score_aggregates = load_score_aggregates(models_dir, scores_version)
+
 st.title("Model Validation")
 st.markdown("**Performance metrics and validation results**")
 
@@ -67,30 +101,32 @@ st.markdown("### Confusion Matrix")
 col1, col2 = st.columns([3, 2])
 
 with col1:
-    cm_data = [
-        [metrics['true_negatives'], metrics['false_positives']],
-        [metrics['false_negatives'], metrics['true_positives']]
-    ]
-    
-    fig = go.Figure(data=go.Heatmap(
-        z=cm_data,
-        x=['Predicted Normal', 'Predicted Laundering'],
-        y=['Actual Normal', 'Actual Laundering'],
-        text=cm_data,
-        texttemplate='%{text:,}',
-        textfont={"size": 18},
-        colorscale='Blues',
-        showscale=False
-    ))
-    
-    fig.update_layout(
-        title="Test Set Performance",
-        xaxis_title="Predicted Label",
-        yaxis_title="Actual Label",
-        height=450
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    def build_confusion_matrix():
+        cm_data = [
+            [metrics['true_negatives'], metrics['false_positives']],
+            [metrics['false_negatives'], metrics['true_positives']]
+        ]
+
+        fig = go.Figure(data=go.Heatmap(
+            z=cm_data,
+            x=['Predicted Normal', 'Predicted Laundering'],
+            y=['Actual Normal', 'Actual Laundering'],
+            text=cm_data,
+            texttemplate='%{text:,}',
+            textfont={"size": 18},
+            colorscale='Blues',
+            showscale=False
+        ))
+
+        fig.update_layout(
+            title="Test Set Performance",
+            xaxis_title="Predicted Label",
+            yaxis_title="Actual Label",
+            height=450
+        )
+        return fig
+
+    st.plotly_chart(cached_chart('confusion_matrix', build_confusion_matrix, version), use_container_width=True)
 
 with col2:
     st.markdown("#### Performance Summary")
@@ -148,4 +184,130 @@ with col3:
 - 27x reduction in false positives
 - ~860 alerts per day (manageable)
 - 62% reduction in analyst workload
-    """)
\ No newline at end of file
+    """)
+
+st.markdown("---")
+
+# Score Distribution
+st.markdown("### Score Distribution")
+
+if score_aggregates is None:
+    st.info(f"No test-set scores found. Publish `models/{TEST_SCORES_FILE}` with `utils.charts.save_test_scores`.")
+else:
+    hist, curves = score_aggregates
+
+    col1, col2 = st.columns([3, 1])
+    with col2:
+        threshold = st.slider(
+            "Decision Threshold",
+            min_value=0.01,
+            max_value=0.99,
+            value=float(config['optimal_threshold']),
+            step=0.01
+        )
+        log_y = st.checkbox("Log scale", value=True)
+        st.caption(f"{curves['n_scores']:,} test transactions, binned server-side")
+    threshold = round(threshold, 2)
+
+    with col1:
+        st.plotly_chart(
+            cached_chart('score_histogram', lambda: histogram_figure(hist, threshold, log_y), scores_version,
+                         threshold=threshold, log_y=log_y),
+            use_container_width=True
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(
+            cached_chart('roc_curve', lambda: roc_figure(curves, threshold), scores_version, threshold=threshold),
+            use_container_width=True
+        )
+    with col2:
+        st.plotly_chart(
+            cached_chart('pr_curve', lambda: pr_figure(curves, threshold), scores_version, threshold=threshold),
+            use_container_width=True
+        )
+
+st.markdown("---")
+
+# Walk-Forward Backtest
+st.markdown("### Walk-Forward Backtest")
+
+if walk_forward is None:
+    st.info("No walk-forward results found. Run the backtest to publish `models/walk_forward_results.json`.")
+else:
+    windows = pd.DataFrame(walk_forward['windows'])
+    # precision / recall are null on days without alerts / laundering cases
+    for metric in ('precision', 'recall'):
+        windows[metric] = pd.to_numeric(windows[metric], errors='coerce')
+
+    def percent_range(values):
+        values = values.dropna()
+        if values.empty:
+            return "undefined"
+        return f"{values.min()*100:.1f}% to {values.max()*100:.1f}%"
+
+    col1, col2 = st.columns([3, 2])
+
+    with col1:
+        def build_walk_forward():
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=windows['test_day'],
+                y=windows['precision'] * 100,
+                name='Precision',
+                mode='lines+markers',
+                line=dict(color='#3b82f6', width=2)
+            ))
+            fig.add_trace(go.Scatter(
+                x=windows['test_day'],
+                y=windows['recall'] * 100,
+                name='Recall',
+                mode='lines+markers',
+                line=dict(color='#dc2626', width=2)
+            ))
+            fig.add_trace(go.Bar(
+                x=windows['test_day'],
+                y=windows['alerts'],
+                name='Alert Volume',
+                marker_color='#94a3b8',
+                opacity=0.4,
+                yaxis='y2'
+            ))
+
+            fig.update_layout(
+                title=f"Train on Days 1..k, Test on Day k+1 (Threshold {walk_forward['threshold']*100:.0f}%)",
+                xaxis_title="Test Day",
+                yaxis=dict(title="Percentage (%)", range=[0, 100]),
+                yaxis2=dict(title="Alerts", overlaying='y', side='right', showgrid=False),
+                height=450,
+                legend=dict(orientation='h', y=-0.2)
+            )
+            return fig
+
+        st.plotly_chart(
+            cached_chart('walk_forward', build_walk_forward, walk_forward_version),
+            use_container_width=True
+        )
+
+    with col2:
+        st.markdown("#### Stability Over Time")
+        st.info(f"""
+**{len(windows)} walk-forward windows**
+- Precision: {percent_range(windows['precision'])}
+- Recall: {percent_range(windows['recall'])}
+- Alerts per day: {windows['alerts'].mean():,.0f} on average
+
+Days without alerts (precision) or laundering cases (recall) are left blank.
+        """)
+
+        st.dataframe(
+            windows[['test_day', 'precision', 'recall', 'alerts']].rename(columns={
+                'test_day': 'Test Day',
+                'precision': 'Precision',
+                'recall': 'Recall',
+                'alerts': 'Alerts'
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
@@ -0,0 +1,3 @@
+"""
+Shared building blocks for the AML pipeline and the Streamlit dashboard.
+"""
@@ -0,0 +1,37 @@
+"""
+Model Artifacts
+Locates the models directory the same way the dashboard pages do and
+fingerprints its contents for cache keys.
+"""
+
+import hashlib
+import os
+
+MODEL_DIRS = ['../../models/', '../models/', './models/']
+
+
+def find_models_dir(required='model_config.json'):
+    """First candidate models directory containing `required`"""
+    for base in MODEL_DIRS:
+        if os.path.exists(os.path.join(base, required)):
+            return base
+    raise FileNotFoundError(f"{required} not found")
+
+
+MODEL_FILES = ('model_config.json', 'calibrated_lightgbm_model.pkl', 'scaler.pkl')
+
+
+def artifact_version(models_dir, files):
+    """Short fingerprint of the size and mtime of `files`; missing files are skipped"""
+    digest = hashlib.sha1()
+    for name in files:
+        path = os.path.join(models_dir, name)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return digest.hexdigest()[:12]
+
+
+def model_version(models_dir):
+    """Fingerprint of the model artifacts; changes whenever one is retrained or replaced"""
+    return artifact_version(models_dir, MODEL_FILES)
@@ -0,0 +1,274 @@
+"""
+Transaction Batches
+Fixed-schema float32 columnar buffers for the scoring path.
+
+The Workbench used to go dict -> one-row DataFrame -> `scaler.transform`
+(another float64 copy) for every transaction, which allocates many times the
+data size per batch. A `TransactionBatch` is allocated once with the model's
+feature order; the derived features, standardization and prediction write into
+its buffers in place. Columns are stored column-major (one contiguous float32
+array per feature), which LightGBM reads without a copy and which maps onto
+Arrow arrays zero-copy.
+
+Per batch, the remaining allocations are on the input side: `np.asarray` on
+list inputs, the datetime64 conversion when `Timestamp` is given instead of
+`hour` / `day_of_week`, and the category lookup when `Payment Format` /
+`Payment Currency` arrive as strings. Callers that score at volume avoid the
+last two by passing precomputed `hour` / `day_of_week` and integer category
+codes (positions in `PAYMENT_FORMATS` / `CURRENCIES`) or Arrow dictionary
+arrays, which only look up their dictionary.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .risk_tables import CURRENCIES
+
+PAYMENT_FORMATS = ["ACH", "Wire", "Cheque", "Cash", "Bitcoin", "Credit Card", "Reinvestment"]
+
+# amount_zscore reference used by the Workbench
+MEAN_AMOUNT = 5000.0
+STD_AMOUNT = 3000.0
+
+RAW_COLUMNS = [
+    'Timestamp', 'From Bank', 'To Bank', 'Amount Received', 'Amount Paid',
+    'Payment Currency', 'Payment Format'
+]
+
+# every feature the batch can compute; a model may use any subset in any order
+FEATURES = [
+    'From Bank', 'To Bank', 'Amount Received', 'Amount Paid', 'amount_zscore',
+    'is_uk_pound', 'is_euro', 'is_usd', 'hour', 'day_of_week', 'is_weekend',
+    'is_night', 'is_ach', 'is_just_below_threshold', 'in_structuring_range',
+    'is_bank_1004', 'is_bank_800', 'uk_pound_structuring', 'ach_weekend',
+    'risk_score_v2'
+]
+
+
+# reused so the category hash tables are only built once
+_FORMAT_INDEX = pd.Index(PAYMENT_FORMATS)
+_CURRENCY_INDEX = pd.Index(CURRENCIES)
+
+
+def _has(raw, name):
+    names = raw.schema.names if hasattr(raw, 'schema') else raw
+    return name in names
+
+
+def _category_codes(values, categories, out):
+    """Write the position of each value in the `categories` Index (-1 if unknown) into `out`
+
+    Integer inputs are taken as codes already; Arrow dictionary arrays only
+    look up their (small) dictionary.
+    """
+    if hasattr(values, 'dictionary') and hasattr(values, 'indices'):
+        lookup = categories.get_indexer(values.dictionary.to_pylist())
+        np.take(lookup, np.asarray(values.indices), out=out)
+        return out
+    array = np.asarray(values)
+    if array.dtype.kind in 'iu':
+        out[:] = array
+        return out
+    # strings: allocates the lookup result (and an object copy of fixed-width str arrays)
+    out[:] = categories.get_indexer(array if array.dtype == object else array.astype(object))
+    return out
+
+
+class TransactionBatch:
+    """Preallocated, reusable float32 feature matrix for up to `capacity` transactions"""
+
+    def __init__(self, feature_names, capacity=1024, scaler=None):
+        self.feature_names = list(feature_names)
+        unknown = set(self.feature_names) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Unknown features: {sorted(unknown)}")
+        self.capacity = capacity
+        self.n_rows = 0
+
+        # model features first, then the remaining intermediates
+        columns = self.feature_names + [name for name in FEATURES if name not in self.feature_names]
+        self._positions = {name: i for i, name in enumerate(columns)}
+        self._buffer = np.zeros(capacity * len(columns), dtype=np.float32)
+        self._scores = np.zeros(capacity, dtype=np.float64)
+        self._seconds = np.zeros(capacity, dtype=np.int64)
+        self._codes = np.zeros(capacity, dtype=np.int64)
+        self._scratch = np.zeros(capacity, dtype=np.float32)
+        self._resize(0)
+
+        self._scaler = None
+        self._mean = None
+        self._scale = None
+        if scaler is not None:
+            self.set_scaler(scaler)
+
+    def _resize(self, n_rows):
+        # column-major over exactly n_rows, so every column and the model's
+        # feature block stay contiguous whatever the batch size
+        n_columns = len(self._positions)
+        self.n_rows = n_rows
+        self._columns = self._buffer[:n_rows * n_columns].reshape(n_columns, n_rows).T
+
+    def __len__(self):
+        return self.n_rows
+
+    @property
+    def X(self):
+        """Model feature matrix (rows x features, Fortran-ordered) for the current rows"""
+        return self._columns[:, :len(self.feature_names)]
+
+    @property
+    def scores(self):
+        """Scores from the last `predict`, valid until the batch is refilled"""
+        return self._scores[:self.n_rows]
+
+    def column(self, name):
+        """Contiguous view of one feature for the current rows"""
+        return self._columns[:, self._positions[name]]
+
+    def set_scaler(self, scaler):
+        """Standardize in place with a fitted StandardScaler; other scalers fall back to `transform`"""
+        names = getattr(scaler, 'feature_names_in_', None)
+        if names is not None and list(names) != self.feature_names:
+            raise ValueError("Scaler was fitted on a different feature order")
+
+        self._scaler = scaler
+        self._mean = self._scale = None
+        if hasattr(scaler, 'mean_') and hasattr(scaler, 'scale_'):
+            n = len(self.feature_names)
+            self._mean = np.zeros(n, dtype=np.float32) if scaler.mean_ is None else scaler.mean_.astype(np.float32)
+            self._scale = np.ones(n, dtype=np.float32) if scaler.scale_ is None else scaler.scale_.astype(np.float32)
+
+    def featurize(self, raw, start=0, stop=None):
+        """Compute features for rows [start, stop) of `raw` into the batch
+
+        `raw` maps the columns in `RAW_COLUMNS` to array-likes (NumPy arrays,
+        pandas Series, Arrow arrays, or a DataFrame / RecordBatch). Precomputed
+        `hour` and `day_of_week` columns may replace `Timestamp`, and
+        `Amount Received` defaults to `Amount Paid`.
+        """
+        length = len(raw['Amount Paid'])
+        stop = length if stop is None else min(stop, length)
+        n = stop - start
+        if n > self.capacity:
+            raise ValueError(f"{n} rows do not fit a batch of capacity {self.capacity}")
+        self._resize(n)
+        rows = slice(start, stop)
+        col = self.column
+        tmp = self._scratch[:n]
+
+        def raw_values(name):
+            return np.asarray(raw[name][rows])
+
+        amount = col('Amount Paid')
+        amount[:] = raw_values('Amount Paid')
+        col('Amount Received')[:] = raw_values('Amount Received') if _has(raw, 'Amount Received') else amount
+        from_bank = col('From Bank')
+        from_bank[:] = raw_values('From Bank')
+        to_bank = col('To Bank')
+        to_bank[:] = raw_values('To Bank')
+
+        # temporal
+        hour = col('hour')
+        day_of_week = col('day_of_week')
+        if _has(raw, 'hour') and _has(raw, 'day_of_week'):
+            hour[:] = raw_values('hour')
+            day_of_week[:] = raw_values('day_of_week')
+        else:
+            seconds = self._seconds[:n]
+            codes = self._codes[:n]
+            seconds[:] = np.asarray(raw['Timestamp'][rows], dtype='datetime64[s]').view(np.int64)
+            np.floor_divide(seconds, 3600, out=seconds)
+            np.remainder(seconds, 24, out=codes)
+            hour[:] = codes
+            # days since 1970-01-01, a Thursday (Monday = 0)
+            np.floor_divide(seconds, 24, out=seconds)
+            np.add(seconds, 3, out=seconds)
+            np.remainder(seconds, 7, out=codes)
+            day_of_week[:] = codes
+
+        is_weekend = col('is_weekend')
+        np.greater_equal(day_of_week, 5, out=is_weekend)
+        is_night = col('is_night')
+        np.greater_equal(hour, 22, out=is_night)
+        np.less(hour, 6, out=tmp)
+        is_night += tmp
+
+        # payment format and currency
+        codes = _category_codes(raw['Payment Format'][rows], _FORMAT_INDEX, self._codes[:n])
+        is_ach = col('is_ach')
+        np.equal(codes, PAYMENT_FORMATS.index('ACH'), out=is_ach)
+
+        codes = _category_codes(raw['Payment Currency'][rows], _CURRENCY_INDEX, self._codes[:n])
+        np.equal(codes, CURRENCIES.index('US Dollar'), out=col('is_usd'))
+        np.equal(codes, CURRENCIES.index('Euro'), out=col('is_euro'))
+        is_uk_pound = col('is_uk_pound')
+        np.equal(codes, CURRENCIES.index('UK Pound'), out=is_uk_pound)
+
+        # amounts
+        below = col('is_just_below_threshold')
+        np.greater_equal(amount, 9500, out=below)
+        np.less(amount, 10000, out=tmp)
+        below *= tmp
+        structuring = col('in_structuring_range')
+        np.greater_equal(amount, 9000, out=structuring)
+        np.less_equal(amount, 10000, out=tmp)
+        structuring *= tmp
+        zscore = col('amount_zscore')
+        np.subtract(amount, MEAN_AMOUNT, out=zscore)
+        zscore /= STD_AMOUNT
+
+        # institutions: either side of the transfer
+        for name, bank in (('is_bank_800', 800), ('is_bank_1004', 1004)):
+            flag = col(name)
+            np.equal(from_bank, bank, out=flag)
+            np.equal(to_bank, bank, out=tmp)
+            np.maximum(flag, tmp, out=flag)
+
+        # interactions and the composite risk indicator
+        np.multiply(is_ach, is_weekend, out=col('ach_weekend'))
+        np.multiply(is_uk_pound, structuring, out=col('uk_pound_structuring'))
+        risk_score = col('risk_score_v2')
+        np.multiply(is_ach, 3.0, out=risk_score)
+        for name, weight in (('is_weekend', 1.5), ('in_structuring_range', 4.0),
+                             ('is_bank_1004', 5.0), ('is_uk_pound', 2.0)):
+            np.multiply(col(name), weight, out=tmp)
+            risk_score += tmp
+        return self
+
+    def transform(self):
+        """Standardize the model features in place with the batch's scaler"""
+        if self._scaler is None:
+            raise ValueError("No scaler set on this batch")
+        X = self.X
+        if self._mean is None:
+            X[:] = self._scaler.transform(X)
+            return self
+        np.subtract(X, self._mean, out=X)
+        np.divide(X, self._scale, out=X)
+        return self
+
+    def predict(self, score):
+        """Write `score(X)` (positive-class probabilities, e.g. `ShadowScorer.score`) into `scores`"""
+        np.copyto(self.scores, score(self.X))
+        return self.scores
+
+    def to_arrow(self):
+        """Model features for the current rows as an Arrow RecordBatch sharing the batch's buffers"""
+        import pyarrow as pa
+
+        return pa.RecordBatch.from_arrays(
+            [pa.array(self.column(name)) for name in self.feature_names],
+            names=self.feature_names
+        )
+
+
+def score_batches(raw, batch, score):
+    """Score every row of `raw` through `batch`, `capacity` rows at a time
+
+    Yields (start, scores) per window; `scores` is a view into the batch and
+    is overwritten by the next window.
+    """
+    length = len(raw['Amount Paid'])
+    for start in range(0, length, batch.capacity):
+        batch.featurize(raw, start, start + batch.capacity).transform()
+        yield start, batch.predict(score)
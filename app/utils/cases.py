@@ -0,0 +1,192 @@
+"""
+Case Building
+Aggregates flagged transactions into account-level cases for analysts.
+
+A structuring ring produces dozens of alerts for the same accounts within a
+few days. Each alert is attached to exactly one case, for its sender account by
+default (the receiver is recorded as a counterparty), so one flagged
+transaction is never queued twice; alerts on the same account whose times are
+within `window` of each other end up in the same case. Every account keeps a small interval
+index (case start times sorted, non-overlapping), so placing a new alert is a
+binary search and case-level risk is updated incrementally as alerts arrive.
+"""
+
+import heapq
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WINDOW = pd.Timedelta('3D')
+ROLES = ('sender', 'receiver')
+
+
+class Case:
+    """Running statistics for one account over one time interval (times in epoch nanoseconds)"""
+
+    __slots__ = ('case_id', 'role', 'account', 'start', 'end', 'n_alerts', 'max_score',
+                 'sum_score', 'total_amount', 'counterparties', 'alert_ids')
+
+    def __init__(self, case_id, role, account, timestamp):
+        self.case_id = case_id
+        self.role = role
+        self.account = account
+        self.start = timestamp
+        self.end = timestamp
+        self.n_alerts = 0
+        self.max_score = 0.0
+        self.sum_score = 0.0
+        self.total_amount = 0.0
+        self.counterparties = set()
+        self.alert_ids = []
+
+    def add(self, alert_id, timestamp, score, amount, counterparty):
+        self.start = min(self.start, timestamp)
+        self.end = max(self.end, timestamp)
+        self.n_alerts += 1
+        self.max_score = max(self.max_score, score)
+        self.sum_score += score
+        self.total_amount += amount
+        self.counterparties.add(counterparty)
+        self.alert_ids.append(alert_id)
+
+    def absorb(self, other):
+        self.start = min(self.start, other.start)
+        self.end = max(self.end, other.end)
+        self.n_alerts += other.n_alerts
+        self.max_score = max(self.max_score, other.max_score)
+        self.sum_score += other.sum_score
+        self.total_amount += other.total_amount
+        self.counterparties |= other.counterparties
+        self.alert_ids.extend(other.alert_ids)
+
+    @property
+    def mean_score(self):
+        return self.sum_score / self.n_alerts if self.n_alerts else 0.0
+
+
+class CaseBuilder:
+    """Incrementally groups alerts into per-account cases over overlapping time windows
+
+    `role` picks the account a case is opened for: 'sender' (fan-out and
+    structuring by the payer) or 'receiver' (fan-in to a collection account).
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW, role='sender'):
+        if role not in ROLES:
+            raise ValueError(f"Unknown role '{role}', expected one of {ROLES}")
+        self.window = pd.Timedelta(window).value
+        self.role = role
+        self.cases = {}
+        # (role, account) -> (sorted case start times, case ids in the same order)
+        self._index = {}
+        self._next_case = 0
+        self._next_alert = 0
+        # bumped on every add; keys the cached ranking below
+        self.version = 0
+        self._ranked = None
+
+    def __len__(self):
+        return len(self.cases)
+
+    @property
+    def n_alerts(self):
+        return self._next_alert
+
+    def _place(self, role, account, alert_id, timestamp, score, amount, counterparty):
+        starts, case_ids = self._index.setdefault((role, account), ([], []))
+
+        # cases on one account never overlap, so only the cases just before
+        # `timestamp + window` can be within reach of the new alert
+        matches = []
+        i = bisect_right(starts, timestamp + self.window) - 1
+        while i >= 0:
+            case = self.cases[case_ids[i]]
+            if case.end + self.window < timestamp:
+                break
+            matches.append(i)
+            i -= 1
+
+        if not matches:
+            case = Case(self._next_case, role, account, timestamp)
+            self._next_case += 1
+            self.cases[case.case_id] = case
+            pos = bisect_right(starts, timestamp)
+            starts.insert(pos, timestamp)
+            case_ids.insert(pos, case.case_id)
+        else:
+            # the alert can bridge neighbouring cases; merge them into the earliest one
+            matches.sort()
+            case = self.cases[case_ids[matches[0]]]
+            for j in reversed(matches[1:]):
+                case.absorb(self.cases.pop(case_ids[j]))
+                del starts[j]
+                del case_ids[j]
+            if timestamp < case.start:
+                starts[matches[0]] = timestamp
+
+        case.add(alert_id, timestamp, score, amount, counterparty)
+        return case.case_id
+
+    def _add(self, timestamp, sender, receiver, score, amount):
+        alert_id = self._next_alert
+        self._next_alert += 1
+        if self.role == 'sender':
+            self._place('sender', sender, alert_id, timestamp, score, amount, receiver)
+        else:
+            self._place('receiver', receiver, alert_id, timestamp, score, amount, sender)
+        return alert_id
+
+    def add_alert(self, timestamp, sender, receiver, score, amount):
+        """Attach one flagged transaction to the case of its sender (or receiver) account"""
+        alert_id = self._add(pd.Timestamp(timestamp).value, sender, receiver, float(score), float(amount))
+        self.version += 1
+        return alert_id
+
+    def add_alerts(self, alerts, timestamp='Timestamp', sender='Account', receiver='Account.1',
+                   score='score', amount='Amount Paid'):
+        """Attach a batch of alerts (DataFrame), in timestamp order"""
+        alerts = alerts.sort_values(timestamp, kind='stable')
+        times = pd.to_datetime(alerts[timestamp]).to_numpy().astype('datetime64[ns]').astype(np.int64)
+        columns = zip(
+            times.tolist(),
+            alerts[sender].tolist(),
+            alerts[receiver].tolist(),
+            alerts[score].to_numpy(dtype=np.float64).tolist(),
+            alerts[amount].to_numpy(dtype=np.float64).tolist()
+        )
+        for ts, snd, rcv, s, amt in columns:
+            self._add(ts, snd, rcv, s, amt)
+        self.version += 1
+
+    def to_frame(self, min_alerts=1, top=None):
+        """Ranked case list: highest max score first, then total amount
+
+        The ranking is cached until the next alert is added, so Streamlit
+        reruns without new alerts do not re-rank every case.
+        """
+        key = (self.version, min_alerts, top)
+        if self._ranked is None or self._ranked[0] != key:
+            self._ranked = (key, self._rank(min_alerts, top))
+        return self._ranked[1].copy()
+
+    def _rank(self, min_alerts, top):
+        cases = (c for c in self.cases.values() if c.n_alerts >= min_alerts)
+        rank = lambda c: (c.max_score, c.total_amount)
+        if top is None:
+            cases = sorted(cases, key=rank, reverse=True)
+        else:
+            cases = heapq.nlargest(top, cases, key=rank)
+
+        return pd.DataFrame({
+            'Case ID': [c.case_id for c in cases],
+            'Role': [c.role for c in cases],
+            'Account': [c.account for c in cases],
+            'First Alert': pd.to_datetime([c.start for c in cases]),
+            'Last Alert': pd.to_datetime([c.end for c in cases]),
+            'Alerts': [c.n_alerts for c in cases],
+            'Max Score': [c.max_score for c in cases],
+            'Mean Score': [c.mean_score for c in cases],
+            'Total Amount': [c.total_amount for c in cases],
+            'Counterparties': [len(c.counterparties) for c in cases]
+        })
@@ -0,0 +1,335 @@
+"""
+Chart Payloads
+Plotly figures built from compact aggregates and cached across Streamlit reruns.
+
+Streamlit re-executes a page on every widget interaction. Figures are built
+once per (chart, model version, filter state) and kept in a bounded LRU cache
+shared by all sessions. The cache holds `go.Figure` objects rather than plain
+dicts: Streamlit treats a Figure as already validated, so a rerun skips both
+trace building and Plotly's figure validation, and only serializes the
+payload. Charts over millions of test scores are never plotted point by point:
+scores are binned into histograms and ROC/PR curves are decimated to a few
+hundred points server-side, so that payload stays a few kilobytes whatever the
+size of the test set.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+TEST_SCORES_FILE = 'test_scores.npz'
+# thresholds the Model Validation slider can select; operating points are exact at each
+OPERATING_THRESHOLDS = np.round(np.arange(0, 101) / 100, 2)
+
+NORMAL_COLOR = '#3b82f6'
+LAUNDERING_COLOR = '#dc2626'
+
+
+class ChartCache:
+    """LRU cache of figures bounded by entry count and total serialized size"""
+
+    def __init__(self, max_entries=64, max_bytes=32 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(name, version=None, **filters):
+        return (name, version, tuple(sorted(filters.items())))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, fig, size):
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (fig, size)
+            self.nbytes += size
+            while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+                self.evictions += 1
+
+    def get_or_build(self, name, build, version=None, **filters):
+        """Cached figure for `name`; `build()` returns a Plotly figure and only runs on a miss
+
+        Filter values must be hashable (strings, numbers, tuples). Cached
+        figures are shared between sessions and must not be modified.
+        """
+        key = self.key(name, version, **filters)
+        fig = self.get(key)
+        if fig is None:
+            # built outside the lock; a concurrent miss on the same key just builds twice
+            fig = build()
+            self.put(key, fig, payload_size(fig))
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# one cache per server process, shared by every page and session
+chart_cache = ChartCache()
+
+
+def cached_chart(name, build, version=None, **filters):
+    """Figure from the shared chart cache, for `st.plotly_chart`"""
+    return chart_cache.get_or_build(name, build, version, **filters)
+
+
+def payload_size(fig):
+    """Size in bytes of the JSON that is sent to the browser for `fig`"""
+    return len(fig.to_json())
+
+
+def score_histogram(scores, y_true, bins=100):
+    """Per-class counts of scores in `bins` equal-width bins over [0, 1]"""
+    scores = np.asarray(scores, dtype=np.float32)
+    y_true = np.asarray(y_true).astype(np.int64)
+    idx = np.clip((scores * bins).astype(np.int64), 0, bins - 1)
+    counts = np.bincount(idx + bins * y_true, minlength=2 * bins).reshape(2, bins)
+    return {
+        'edges': np.linspace(0.0, 1.0, bins + 1),
+        'normal': counts[0],
+        'laundering': counts[1]
+    }
+
+
+def _decimate(x, y, max_points):
+    """Indices of at most `max_points` points spread evenly along the curve's length"""
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    length = np.concatenate([[0.0], np.cumsum(np.abs(np.diff(x)) + np.abs(np.diff(y)))])
+    targets = np.linspace(0.0, length[-1], max_points)
+    idx = np.searchsorted(length, targets, side='left')
+    return np.unique(np.concatenate([[0], np.clip(idx, 0, len(x) - 1), [len(x) - 1]]))
+
+
+def curve_points(y_true, scores, max_points=500, operating_thresholds=OPERATING_THRESHOLDS):
+    """ROC and precision-recall curves decimated to `max_points`, with exact AUC and AP
+
+    Equivalent to sklearn's `roc_curve` / `precision_recall_curve` computed on
+    every distinct threshold, then thinned for plotting. Operating points
+    (alerting on score >= threshold) are computed on the full curve for each of
+    `operating_thresholds`, since the thinned curves skip most thresholds. AUC
+    and AP are NaN unless both classes are present.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    y_true = np.asarray(y_true).astype(np.int64)
+    order = np.argsort(-scores, kind='stable')
+    scores = scores[order]
+    cum_tp = np.concatenate([[0], np.cumsum(y_true[order])])
+
+    # last position of every distinct threshold, highest score first
+    ends = np.flatnonzero(np.diff(scores))
+    if len(scores):
+        ends = np.concatenate([ends, [len(scores) - 1]])
+    tp = cum_tp[ends + 1]
+    fp = (ends + 1) - tp
+    thresholds = scores[ends]
+
+    n_positive = int(cum_tp[-1])
+    n_negative = len(scores) - n_positive
+    n_pos = max(n_positive, 1)
+    n_neg = max(n_negative, 1)
+    tpr = np.concatenate([[0.0], tp / n_pos])
+    fpr = np.concatenate([[0.0], fp / n_neg])
+    precision = tp / (tp + fp)
+    recall = tp / n_pos
+
+    roc_auc = average_precision = np.nan
+    if n_positive and n_negative:
+        roc_auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+        average_precision = float(np.sum(np.diff(np.concatenate([[0.0], recall])) * precision))
+
+    operating_thresholds = np.asarray(operating_thresholds, dtype=np.float64)
+    n_alerts = np.searchsorted(-scores, -operating_thresholds, side='right')
+    alert_tp = cum_tp[n_alerts]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        alert_precision = np.where(n_alerts > 0, alert_tp / n_alerts, np.nan)
+
+    roc = _decimate(fpr, tpr, max_points)
+    pr = _decimate(recall, precision, max_points)
+    return {
+        'fpr': fpr[roc],
+        'tpr': tpr[roc],
+        'roc_thresholds': np.concatenate([[np.inf], thresholds])[roc],
+        'precision': precision[pr],
+        'recall': recall[pr],
+        'pr_thresholds': thresholds[pr],
+        'roc_auc': roc_auc,
+        'average_precision': average_precision,
+        'operating_points': {
+            'thresholds': operating_thresholds,
+            'fpr': (n_alerts - alert_tp) / n_neg,
+            'tpr': alert_tp / n_pos,
+            'precision': alert_precision,
+            'recall': alert_tp / n_pos
+        },
+        'n_scores': int(len(scores))
+    }
+
+
+def save_test_scores(models_dir, y_true, scores):
+    """Publish test-set labels and scores for the Model Validation page"""
+    path = os.path.join(models_dir, TEST_SCORES_FILE)
+    with open(path, 'wb') as f:
+        np.savez_compressed(
+            f,
+            y_true=np.asarray(y_true).astype(np.int8),
+            scores=np.asarray(scores, dtype=np.float32)
+        )
+    return path
+
+
+def load_test_scores(models_dir):
+    with np.load(os.path.join(models_dir, TEST_SCORES_FILE)) as arrays:
+        return arrays['y_true'], arrays['scores']
+
+
+def class_bar_figure(categories, normal, laundering, title, xaxis_title, yaxis_range=None, height=400):
+    """Grouped Normal vs Laundering percentage bars, as used on the EDA page"""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for name, values, color in (('Normal', normal, NORMAL_COLOR), ('Laundering', laundering, LAUNDERING_COLOR)):
+        fig.add_trace(go.Bar(
+            name=name,
+            x=categories,
+            y=values,
+            marker_color=color,
+            text=[f'{v}%' for v in values],
+            textposition='outside'
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=xaxis_title,
+        yaxis_title="Percentage (%)",
+        barmode='group',
+        height=height,
+        yaxis_range=yaxis_range
+    )
+    return fig
+
+
+def histogram_figure(hist, threshold=None, log_y=True, height=400):
+    """Score distribution by class from `score_histogram` counts"""
+    import plotly.graph_objects as go
+
+    edges = hist['edges']
+    centers = (edges[:-1] + edges[1:]) / 2
+    width = float(edges[1] - edges[0])
+
+    fig = go.Figure()
+    for name, counts, color in (('Normal', hist['normal'], NORMAL_COLOR),
+                                ('Laundering', hist['laundering'], LAUNDERING_COLOR)):
+        fig.add_trace(go.Bar(
+            name=name,
+            x=centers,
+            y=counts,
+            width=width,
+            marker_color=color,
+            opacity=0.7
+        ))
+    if threshold is not None:
+        fig.add_vline(x=threshold, line_dash='dash', line_color='#111827',
+                      annotation_text=f"Threshold {threshold*100:.0f}%")
+
+    fig.update_layout(
+        title="Test Score Distribution",
+        xaxis_title="Predicted Laundering Probability",
+        yaxis_title="Transactions",
+        yaxis_type='log' if log_y else 'linear',
+        barmode='overlay',
+        height=height,
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig
+
+
+def _operating_point(curves, x, y, threshold):
+    # exact point from `curve_points`, at the nearest precomputed threshold
+    points = curves['operating_points']
+    i = int(np.argmin(np.abs(points['thresholds'] - threshold)))
+    return points[x][i], points[y][i]
+
+
+def roc_figure(curves, threshold=None, height=400):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=curves['fpr'],
+        y=curves['tpr'],
+        name=f"ROC (AUC {curves['roc_auc']:.3f})",
+        mode='lines',
+        line=dict(color=NORMAL_COLOR, width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=[0, 1],
+        y=[0, 1],
+        name='Random',
+        mode='lines',
+        line=dict(color='#94a3b8', dash='dash')
+    ))
+    if threshold is not None:
+        x, y = _operating_point(curves, 'fpr', 'tpr', threshold)
+        fig.add_trace(go.Scatter(x=[x], y=[y], name='Threshold', mode='markers',
+                                 marker=dict(color=LAUNDERING_COLOR, size=10)))
+
+    fig.update_layout(
+        title="ROC Curve",
+        xaxis_title="False Positive Rate",
+        yaxis_title="True Positive Rate",
+        height=height,
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig
+
+
+def pr_figure(curves, threshold=None, height=400):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=curves['recall'],
+        y=curves['precision'],
+        name=f"Precision-Recall (AP {curves['average_precision']:.3f})",
+        mode='lines',
+        line=dict(color=NORMAL_COLOR, width=2)
+    ))
+    if threshold is not None:
+        x, y = _operating_point(curves, 'recall', 'precision', threshold)
+        fig.add_trace(go.Scatter(x=[x], y=[y], name='Threshold', mode='markers',
+                                 marker=dict(color=LAUNDERING_COLOR, size=10)))
+
+    fig.update_layout(
+        title="Precision-Recall Curve",
+        xaxis_title="Recall",
+        yaxis_title="Precision",
+        yaxis_range=[0, 1.05],
+        height=height,
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig
@@ -0,0 +1,64 @@
+"""
+Data access helpers
+Chunked readers so pipeline stages can run out-of-core over the 31.9M-row dataset.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 2_000_000
+
+
+def iter_chunks(source, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrame chunks from a parquet path, a DataFrame or an iterable of DataFrames
+
+    `source` may also be a callable returning any of these, called once per
+    pass, so multi-pass readers can re-open a chunk stream.
+    """
+    if callable(source):
+        source = source()
+
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[list(columns)]
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        columns = None if columns is None else list(columns)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+
+    for chunk in source:
+        if not isinstance(chunk, pd.DataFrame):
+            chunk = chunk.to_pandas()
+        yield chunk if columns is None else chunk[list(columns)]
+
+
+def check_reiterable(source):
+    """Raise TypeError for one-shot iterators, which a second pass over `source` would see empty"""
+    if isinstance(source, (str, os.PathLike, pd.DataFrame)) or callable(source):
+        return
+    if iter(source) is source:
+        raise TypeError("Chunk iterators can only be read once; pass a list of chunks "
+                        "or a callable that returns a new iterator")
+
+
+def time_mask(chunk, time_range):
+    """Rows of `chunk` whose Timestamp falls in [start, end); either bound may be None"""
+    if time_range is None:
+        return np.ones(len(chunk), dtype=bool)
+    start, end = time_range
+    ts = pd.to_datetime(chunk['Timestamp'])
+    mask = np.ones(len(chunk), dtype=bool)
+    if start is not None:
+        mask &= (ts >= pd.Timestamp(start)).to_numpy()
+    if end is not None:
+        mask &= (ts < pd.Timestamp(end)).to_numpy()
+    return mask
@@ -0,0 +1,272 @@
+"""
+Streaming Deduplication
+Exact row deduplication for ingestion using 64-bit row fingerprints.
+
+Each row is hashed once to a uint64 fingerprint and checked against a compact
+open-addressing set (8 bytes per slot), so duplicates are dropped as record
+batches stream through instead of hashing the full frame twice with
+`df.duplicated()` / `df.drop_duplicates()`. The set can be saved and reloaded
+so daily increments are deduplicated against history.
+
+Fingerprints depend on column order and dtype, so the deduplicator records the
+schema of the first chunk it sees (saved next to the index) and reorders and
+casts every later chunk to it before hashing; an increment read with
+`Amount Paid` as float instead of int still matches its history.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data import DEFAULT_CHUNK_SIZE, iter_chunks
+
+EMPTY = np.uint64(0)
+# stand-in for a genuine zero fingerprint, since 0 marks an empty slot
+ZERO_KEY = np.uint64(0x9E3779B97F4A7C15)
+MAX_LOAD = 0.5
+
+
+def _remap_empty(keys):
+    keys = np.asarray(keys, dtype=np.uint64)
+    return np.where(keys == EMPTY, ZERO_KEY, keys)
+
+
+def _schema_path(path):
+    return os.fspath(path) + '.schema.json'
+
+
+def row_fingerprints(chunk):
+    """Hash every row of a chunk to a 64-bit fingerprint"""
+    return _remap_empty(pd.util.hash_pandas_object(chunk, index=False).to_numpy(dtype=np.uint64))
+
+
+class FingerprintSet:
+    """Open-addressing (linear probing) set of uint64 fingerprints backed by one NumPy array"""
+
+    def __init__(self, capacity=1 << 20):
+        size = 1
+        while size < capacity:
+            size <<= 1
+        self.table = np.zeros(size, dtype=np.uint64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def _grow(self, needed):
+        size = len(self.table)
+        while needed > size * MAX_LOAD:
+            size <<= 1
+        if size == len(self.table):
+            return
+        old = self.table[self.table != EMPTY]
+        self.table = np.zeros(size, dtype=np.uint64)
+        self.size = 0
+        self._insert_unique(old)
+
+    def _insert_unique(self, keys):
+        """Insert keys that are distinct from each other; return mask of keys that were new"""
+        mask = np.uint64(len(self.table) - 1)
+        slots = keys & mask
+        pending = np.arange(len(keys))
+        is_new = np.zeros(len(keys), dtype=bool)
+
+        while len(pending):
+            current = self.table[slots[pending]]
+            found = current == keys[pending]
+            empty = current == EMPTY
+
+            # several pending keys may target the same empty slot: scatter them all and
+            # the key that reads back from the slot is the one that claimed it
+            candidates = pending[empty]
+            self.table[slots[candidates]] = keys[candidates]
+            claimed = np.zeros(len(pending), dtype=bool)
+            claimed[empty] = self.table[slots[candidates]] == keys[candidates]
+            is_new[pending[claimed]] = True
+
+            pending = pending[~(found | claimed)]
+
+            # every remaining slot now holds a different key, so probe the next one
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+
+        self.size += int(is_new.sum())
+        return is_new
+
+    def add(self, keys):
+        """Add fingerprints; return a mask that is True where a key was not seen before
+
+        Repeats within `keys` count as seen after their first occurrence.
+        """
+        keys = _remap_empty(keys)
+        unique_keys, first_index = np.unique(keys, return_index=True)
+        self._grow(self.size + len(unique_keys))
+
+        is_new = np.zeros(len(keys), dtype=bool)
+        is_new[first_index] = self._insert_unique(unique_keys)
+        return is_new
+
+    def contains(self, keys):
+        """Return a mask that is True where a key is already in the set"""
+        keys = _remap_empty(keys)
+        mask = np.uint64(len(self.table) - 1)
+        slots = keys & mask
+        pending = np.arange(len(keys))
+        found = np.zeros(len(keys), dtype=bool)
+
+        while len(pending):
+            current = self.table[slots[pending]]
+            hit = current == keys[pending]
+            found[pending[hit]] = True
+            pending = pending[~hit & (current != EMPTY)]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+        return found
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            np.save(f, self.table)
+
+    @classmethod
+    def load(cls, path):
+        fingerprints = cls(capacity=1)
+        with open(path, 'rb') as f:
+            fingerprints.table = np.load(f)
+        fingerprints.size = int((fingerprints.table != EMPTY).sum())
+        return fingerprints
+
+
+class Deduplicator:
+    """Drops exact duplicate rows from a stream of chunks, keeping the first occurrence"""
+
+    def __init__(self, fingerprints=None, schema=None, max_samples=20):
+        self.fingerprints = fingerprints if fingerprints is not None else FingerprintSet()
+        # [(column, dtype name)] that every chunk is conformed to before hashing
+        self.schema = None if schema is None else [tuple(field) for field in schema]
+        self.max_samples = max_samples
+        self.rows_seen = 0
+        self.duplicates = 0
+        self.samples = []
+
+    def conform(self, chunk):
+        """Reorder and cast `chunk` to the deduplication schema, adopting the first chunk's schema
+
+        Raises ValueError if the columns differ or a cast would change values.
+        """
+        if self.schema is None:
+            self.schema = [(column, str(dtype)) for column, dtype in chunk.dtypes.items()]
+            return chunk
+
+        columns = [column for column, _ in self.schema]
+        if len(chunk.columns) != len(columns) or set(chunk.columns) != set(columns):
+            raise ValueError(f"Columns {list(chunk.columns)} do not match the deduplication schema {columns}")
+        if list(chunk.columns) != columns:
+            chunk = chunk[columns]
+
+        casts = {column: dtype for column, dtype in self.schema if str(chunk[column].dtype) != dtype}
+        if not casts:
+            return chunk
+        cast = chunk.astype(casts)
+        for column in casts:
+            before, after = chunk[column].to_numpy(), cast[column].to_numpy()
+            if before.dtype.kind in 'biuf' and after.dtype.kind in 'biuf' and not np.array_equal(before, after):
+                raise ValueError(f"Column {column!r} cannot be cast to {casts[column]} without changing values")
+        return cast
+
+    def process(self, chunk):
+        """Return the rows of `chunk` not seen earlier in this stream or in loaded history
+
+        Kept rows are returned conformed to the deduplication schema.
+        """
+        chunk = self.conform(chunk)
+        is_new = self.fingerprints.add(row_fingerprints(chunk))
+
+        n_dup = len(chunk) - int(is_new.sum())
+        self.rows_seen += len(chunk)
+        self.duplicates += n_dup
+
+        n_sampled = sum(len(s) for s in self.samples)
+        if n_dup and n_sampled < self.max_samples:
+            self.samples.append(chunk[~is_new].head(self.max_samples - n_sampled))
+
+        return chunk[is_new]
+
+    def report(self):
+        """Duplicate counts and a sample of dropped rows"""
+        return {
+            'rows_seen': self.rows_seen,
+            'duplicates': self.duplicates,
+            'rows_kept': self.rows_seen - self.duplicates,
+            'duplicate_rate': self.duplicates / self.rows_seen if self.rows_seen else 0.0,
+            'index_size_mb': self.fingerprints.nbytes / 1024**2,
+            'samples': pd.concat(self.samples, ignore_index=True) if self.samples else pd.DataFrame()
+        }
+
+    def save(self, path):
+        """Save the fingerprint index to `path` and its schema next to it"""
+        self.fingerprints.save(path)
+        with open(_schema_path(path), 'w') as f:
+            json.dump(self.schema, f, indent=2)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        schema = None
+        if os.path.exists(_schema_path(path)):
+            with open(_schema_path(path), 'r') as f:
+                schema = json.load(f)
+        return cls(FingerprintSet.load(path), schema=schema, **kwargs)
+
+
+def deduplicate(source, deduplicator=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield deduplicated chunks from a parquet path, a DataFrame or an iterable of chunks"""
+    deduplicator = deduplicator if deduplicator is not None else Deduplicator()
+    for chunk in iter_chunks(source, chunk_size=chunk_size):
+        kept = deduplicator.process(chunk)
+        if len(kept):
+            yield kept
+
+
+def deduplicate_to_parquet(source, output_path, history_path=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream `source` into a deduplicated parquet file and return the dedup report
+
+    If `history_path` points to a saved fingerprint index, rows already present in
+    history are dropped too and the index is updated in place, so the same call
+    handles both the initial load and daily increments. The output file is
+    always written, with no rows if every row was a duplicate.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if history_path is not None and os.path.exists(history_path):
+        deduplicator = Deduplicator.load(history_path)
+    else:
+        deduplicator = Deduplicator()
+
+    writer = None
+    try:
+        for chunk in iter_chunks(source, chunk_size=chunk_size):
+            chunk = deduplicator.conform(chunk)
+            if writer is None:
+                # schema from the whole first chunk, so it is known even if every row is dropped
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(output_path, schema, compression='snappy')
+            kept = deduplicator.process(chunk)
+            if len(kept):
+                writer.write_table(pa.Table.from_pandas(kept, schema=schema, preserve_index=False))
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        # empty source: an empty file with the history schema, if there is one
+        empty = pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in deduplicator.schema or []})
+        pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), output_path, compression='snappy')
+
+    if history_path is not None:
+        deduplicator.save(history_path)
+
+    return deduplicator.report()
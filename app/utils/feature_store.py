@@ -0,0 +1,377 @@
+"""
+Point-in-Time Feature Store
+Time-indexed per-entity feature snapshots with a vectorized as-of join.
+
+For every entity (sender account, receiver account, sender/receiver pair, ...)
+the store keeps cumulative totals after each timestamp at which the entity
+transacted. A windowed feature such as "prior 7-day volume" is then the
+difference of two as-of lookups, cum(t) - cum(t - 7 days), so history-based
+features only ever see events before the transaction being scored. The same
+definitions and lookup code serve training (tens of millions of rows at once)
+and online scoring (one transaction at a time), which avoids leakage across
+the chronological train/test split and train/serve skew.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+TIMESTAMP = 'Timestamp'
+COUNT = '__count__'
+
+# snapshot keys pack (entity code, seconds since ORIGIN) into one sortable int64
+ORIGIN = np.datetime64('2000-01-01T00:00:00', 's')
+TIME_BITS = 34
+TIME_MASK = (1 << TIME_BITS) - 1
+
+
+class FeatureDefinition:
+    """A rolling or all-time aggregate of one column per entity"""
+
+    AGGREGATIONS = ('sum', 'count', 'mean')
+
+    def __init__(self, name, entity, value=None, window=None, agg='sum'):
+        if agg not in self.AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation '{agg}', expected one of {self.AGGREGATIONS}")
+        if agg != 'count' and value is None:
+            raise ValueError(f"Feature '{name}' needs a value column for '{agg}'")
+        self.name = name
+        self.entity = [entity] if isinstance(entity, str) else list(entity)
+        self.value = value
+        self.window = window
+        self.agg = agg
+
+    @property
+    def window_seconds(self):
+        return None if self.window is None else int(pd.Timedelta(self.window).total_seconds())
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'entity': self.entity,
+            'value': self.value,
+            'window': self.window,
+            'agg': self.agg
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+DEFAULT_FEATURES = [
+    FeatureDefinition('sender_volume_7d', 'Account', 'Amount Paid', window='7D', agg='sum'),
+    FeatureDefinition('sender_count_7d', 'Account', window='7D', agg='count'),
+    FeatureDefinition('sender_mean_amount_7d', 'Account', 'Amount Paid', window='7D', agg='mean'),
+    FeatureDefinition('receiver_count_1d', 'Account.1', window='1D', agg='count'),
+    FeatureDefinition('pair_count_prior', ['Account', 'Account.1'], agg='count'),
+]
+
+
+def _to_seconds(timestamps):
+    values = pd.to_datetime(pd.Series(timestamps)).to_numpy().astype('datetime64[s]')
+    return (values - ORIGIN).astype(np.int64)
+
+
+def _encode(index, values, extend):
+    """Integer codes of `values` in `index`, optionally appending unseen values"""
+    if index is None:
+        codes, uniques = pd.factorize(values)
+        return codes.astype(np.int64), pd.Index(uniques)
+
+    codes = index.get_indexer(values).astype(np.int64)
+    unseen = codes < 0
+    if extend and unseen.any():
+        index = index.append(pd.Index(pd.unique(values[unseen])))
+        codes[unseen] = index.get_indexer(values[unseen])
+    return codes, index
+
+
+class EntityEncoder:
+    """Maps single or composite entity keys to dense integer codes
+
+    Each entity column has its own value index; composite keys are folded
+    pairwise as (code << 32 | next column code) into an int64 index, which
+    avoids building tuple-based MultiIndexes over tens of millions of rows.
+    """
+
+    def __init__(self, entity, value_indexes=None, pair_indexes=None):
+        self.entity = list(entity)
+        self.value_indexes = value_indexes or [None] * len(self.entity)
+        self.pair_indexes = pair_indexes or [None] * (len(self.entity) - 1)
+
+    def __len__(self):
+        index = self.pair_indexes[-1] if self.pair_indexes else self.value_indexes[0]
+        return 0 if index is None else len(index)
+
+    def encode(self, frame, extend=False):
+        """Codes for every row of `frame`; -1 for unknown entities unless `extend`"""
+        codes = None
+        for i, col in enumerate(self.entity):
+            column_codes, self.value_indexes[i] = _encode(
+                self.value_indexes[i], frame[col].to_numpy(), extend or self.value_indexes[i] is None
+            )
+            if codes is None:
+                codes = column_codes
+                continue
+
+            unknown = (codes < 0) | (column_codes < 0)
+            pairs = (codes << 32) | np.where(column_codes < 0, 0, column_codes)
+            codes, self.pair_indexes[i - 1] = _encode(
+                self.pair_indexes[i - 1], pairs, extend or self.pair_indexes[i - 1] is None
+            )
+            codes[unknown] = -1
+        return codes
+
+    def save(self, path, prefix):
+        for i, index in enumerate(self.value_indexes):
+            pd.DataFrame({'value': index}).to_parquet(os.path.join(path, f'{prefix}_values_{i}.parquet'), index=False)
+        for i, index in enumerate(self.pair_indexes):
+            pd.DataFrame({'pair': index}).to_parquet(os.path.join(path, f'{prefix}_pairs_{i}.parquet'), index=False)
+
+    @classmethod
+    def load(cls, path, prefix, entity):
+        value_indexes = [
+            pd.Index(pd.read_parquet(os.path.join(path, f'{prefix}_values_{i}.parquet'))['value'])
+            for i in range(len(entity))
+        ]
+        pair_indexes = [
+            pd.Index(pd.read_parquet(os.path.join(path, f'{prefix}_pairs_{i}.parquet'))['pair'])
+            for i in range(len(entity) - 1)
+        ]
+        return cls(entity, value_indexes, pair_indexes)
+
+
+class EntitySnapshots:
+    """Cumulative count and value totals per entity, one row per (entity, timestamp)"""
+
+    def __init__(self, encoder, value_columns, keys, totals):
+        self.encoder = encoder
+        self.value_columns = list(value_columns)
+        self.keys = keys
+        self.totals = totals
+
+    @property
+    def entity(self):
+        return self.encoder.entity
+
+    @classmethod
+    def build(cls, transactions, entity, value_columns, encoder=None, base=None):
+        """Materialize snapshots from raw transactions
+
+        `encoder` and `base` let an increment continue the codes and running
+        totals of an existing snapshot table (see `FeatureStore.append`).
+        """
+        encoder = encoder if encoder is not None else EntityEncoder(entity)
+        codes = encoder.encode(transactions, extend=True)
+
+        seconds = _to_seconds(transactions[TIMESTAMP])
+        keys = (codes << TIME_BITS) | seconds
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        sorted_codes = keys >> TIME_BITS
+
+        n = len(keys)
+        entity_start = np.ones(n, dtype=bool)
+        entity_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+        start_idx = np.maximum.accumulate(np.where(entity_start, np.arange(n), 0))
+
+        if base is not None:
+            base_pos = base.positions(sorted_codes, np.full(n, TIME_MASK))
+
+        totals = {}
+        for col in [COUNT, *value_columns]:
+            if col == COUNT:
+                v = np.ones(n)
+            else:
+                v = np.nan_to_num(transactions[col].to_numpy(dtype=np.float64)[order])
+            running = np.cumsum(v)
+            cum = running - (running[start_idx] - v[start_idx])
+            if base is not None:
+                cum += base.gather(base_pos, col)
+            totals[col] = cum
+
+        # several transactions can share an entity and timestamp; keep the last running total
+        last = np.ones(n, dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        keys = keys[last]
+        totals = {col: cum[last] for col, cum in totals.items()}
+        return cls(encoder, value_columns, keys, totals)
+
+    def positions(self, codes, seconds, strict=True):
+        """As-of snapshot position for each (code, seconds) query, -1 where there is none
+
+        With `strict=True` only snapshots strictly before `seconds` are used,
+        which matches what is available online when a transaction is scored;
+        `strict=False` returns the latest snapshot at or before `seconds`.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        seconds = np.clip(np.asarray(seconds, dtype=np.int64), 0, TIME_MASK)
+        query = (codes << TIME_BITS) | seconds
+
+        # searching sorted queries keeps the binary searches cache friendly
+        order = np.argsort(query)
+        pos = np.empty(len(query), dtype=np.int64)
+        pos[order] = np.searchsorted(self.keys, query[order], side='left' if strict else 'right') - 1
+
+        safe_pos = np.clip(pos, 0, None)
+        valid = (codes >= 0) & (pos >= 0) & ((self.keys[safe_pos] >> TIME_BITS) == codes)
+        return np.where(valid, pos, -1)
+
+    def gather(self, pos, column):
+        """Cumulative totals at snapshot positions, 0 where there is no snapshot"""
+        return np.where(pos >= 0, self.totals[column][np.clip(pos, 0, None)], 0.0)
+
+    def last_seconds(self):
+        """Latest snapshot time per entity code"""
+        last = np.full(len(self.encoder), -1, dtype=np.int64)
+        last[self.keys >> TIME_BITS] = self.keys & TIME_MASK
+        return last
+
+
+class FeatureStore:
+    """Historical and online access to point-in-time entity features"""
+
+    def __init__(self, definitions=None):
+        self.definitions = list(DEFAULT_FEATURES if definitions is None else definitions)
+        self.snapshots = {}
+
+    @property
+    def feature_names(self):
+        return [d.name for d in self.definitions]
+
+    def _entity_groups(self):
+        groups = {}
+        for definition in self.definitions:
+            columns = groups.setdefault(tuple(definition.entity), [])
+            if definition.value is not None and definition.value not in columns:
+                columns.append(definition.value)
+        return groups
+
+    def _required_columns(self):
+        columns = [TIMESTAMP]
+        for entity, value_columns in self._entity_groups().items():
+            columns.extend([*entity, *value_columns])
+        return list(dict.fromkeys(columns))
+
+    def _read(self, transactions):
+        if isinstance(transactions, (str, os.PathLike)):
+            return pd.read_parquet(transactions, columns=self._required_columns())
+        return transactions
+
+    def materialize(self, transactions):
+        """Build snapshots for every definition from a DataFrame or parquet path"""
+        transactions = self._read(transactions)
+        self.snapshots = {
+            entity: EntitySnapshots.build(transactions, entity, value_columns)
+            for entity, value_columns in self._entity_groups().items()
+        }
+        return self
+
+    def append(self, transactions):
+        """Fold a later increment of transactions into the existing snapshots"""
+        transactions = self._read(transactions)
+        for entity, value_columns in self._entity_groups().items():
+            current = self.snapshots.get(entity)
+            if current is None:
+                self.snapshots[entity] = EntitySnapshots.build(transactions, entity, value_columns)
+                continue
+
+            codes = current.encoder.encode(transactions)
+            seconds = _to_seconds(transactions[TIMESTAMP])
+            known = codes >= 0
+            if (seconds[known] < current.last_seconds()[codes[known]]).any():
+                raise ValueError("Increment contains transactions older than the stored snapshots")
+
+            increment = EntitySnapshots.build(
+                transactions, entity, value_columns, encoder=current.encoder, base=current
+            )
+            keys = np.concatenate([current.keys, increment.keys])
+            order = np.argsort(keys, kind='stable')
+            totals = {
+                col: np.concatenate([current.totals[col], increment.totals[col]])[order]
+                for col in current.totals
+            }
+            self.snapshots[entity] = EntitySnapshots(current.encoder, value_columns, keys[order], totals)
+        return self
+
+    def get_historical_features(self, transactions, strict=True):
+        """Attach every feature to each transaction as of its Timestamp
+
+        Returns a float32 DataFrame aligned with `transactions.index`.
+        """
+        seconds = _to_seconds(transactions[TIMESTAMP])
+        features = {}
+        codes_by_entity = {}
+        positions = {}
+
+        def windowed(snapshots, entity, window_seconds, column):
+            # as-of positions are shared by every feature on the same entity and window
+            for offset in (0, window_seconds):
+                if offset is not None and (entity, offset) not in positions:
+                    positions[entity, offset] = snapshots.positions(
+                        codes_by_entity[entity], seconds - offset, strict
+                    )
+            total = snapshots.gather(positions[entity, 0], column)
+            if window_seconds is not None:
+                total = total - snapshots.gather(positions[entity, window_seconds], column)
+            return total
+
+        for definition in self.definitions:
+            entity = tuple(definition.entity)
+            snapshots = self.snapshots[entity]
+            if entity not in codes_by_entity:
+                codes_by_entity[entity] = snapshots.encoder.encode(transactions)
+            window = definition.window_seconds
+
+            if definition.agg == 'count':
+                values = windowed(snapshots, entity, window, COUNT)
+            elif definition.agg == 'sum':
+                values = windowed(snapshots, entity, window, definition.value)
+            else:
+                count = windowed(snapshots, entity, window, COUNT)
+                total = windowed(snapshots, entity, window, definition.value)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values = np.where(count > 0, total / count, 0.0)
+
+            features[definition.name] = values.astype(np.float32)
+
+        return pd.DataFrame(features, index=transactions.index)
+
+    def get_online_features(self, transaction, strict=True):
+        """Feature values for a single transaction record (dict with entity columns and Timestamp)"""
+        frame = pd.DataFrame([transaction])
+        return self.get_historical_features(frame, strict).iloc[0].to_dict()
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        groups = []
+        for i, (entity, snapshots) in enumerate(self.snapshots.items()):
+            snapshots.encoder.save(path, f'entities_{i}')
+            table = pd.DataFrame({'key': snapshots.keys, **snapshots.totals})
+            table.to_parquet(os.path.join(path, f'snapshots_{i}.parquet'), index=False)
+            groups.append({'entity': list(entity), 'value_columns': snapshots.value_columns})
+
+        with open(os.path.join(path, 'feature_store.json'), 'w') as f:
+            json.dump({
+                'definitions': [d.to_dict() for d in self.definitions],
+                'entity_groups': groups
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, 'feature_store.json'), 'r') as f:
+            meta = json.load(f)
+
+        store = cls([FeatureDefinition.from_dict(d) for d in meta['definitions']])
+        for i, group in enumerate(meta['entity_groups']):
+            entity = group['entity']
+            encoder = EntityEncoder.load(path, f'entities_{i}', entity)
+            table = pd.read_parquet(os.path.join(path, f'snapshots_{i}.parquet'))
+            totals = {col: table[col].to_numpy() for col in table.columns if col != 'key'}
+            store.snapshots[tuple(entity)] = EntitySnapshots(
+                encoder, group['value_columns'], table['key'].to_numpy(), totals
+            )
+        return store
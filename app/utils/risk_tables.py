@@ -0,0 +1,265 @@
+"""
+Risk Lookup Tables
+Smoothed target encoding and volume for every bank ID and currency pair.
+
+Replaces the hardcoded `is_bank_800` / `is_bank_1004` and currency flags (and
+the raw `From Bank` / `To Bank` IDs) with data-driven lookups. Tables are built
+out-of-core from Gold data and stored as dense arrays indexed by integer ID, so
+online featurization is one array gather per transaction. For training rows,
+`featurize(..., history=True)` only uses days strictly before each
+transaction's day, which keeps the encodings free of target leakage across the
+chronological split. Serving only loads the collapsed arrays (`RiskLookup`),
+not the per-day history.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data import DEFAULT_CHUNK_SIZE, iter_chunks
+
+TARGET = 'Is Laundering'
+
+CURRENCIES = [
+    "US Dollar", "Euro", "UK Pound", "Yen", "Yuan", "Bitcoin",
+    "Australian Dollar", "Brazil Real", "Canadian Dollar",
+    "Mexican Peso", "Ruble", "Rupee", "Saudi Riyal",
+    "Shekel", "Swiss Franc"
+]
+
+TABLES = ('from_bank', 'to_bank', 'currency_pair')
+FEATURE_NAMES = [f'{name}_{kind}' for name in TABLES for kind in ('risk', 'volume')]
+
+# risk relative to the overall laundering rate at which an institution is flagged
+HIGH_RISK_MULTIPLIER = 3.0
+
+
+def _currency_codes(values):
+    return pd.Index(CURRENCIES).get_indexer(pd.Series(values).astype(str))
+
+
+def _table_ids(chunk):
+    """Integer ID per table for every row; -1 where the value is unknown"""
+    pay = _currency_codes(chunk['Payment Currency'])
+    receive = _currency_codes(chunk['Receiving Currency'])
+    pair = np.where((pay >= 0) & (receive >= 0), pay * len(CURRENCIES) + receive, -1)
+    return {
+        'from_bank': chunk['From Bank'].to_numpy().astype(np.int64),
+        'to_bank': chunk['To Bank'].to_numpy().astype(np.int64),
+        'currency_pair': pair
+    }
+
+
+def _gather(array, ids, default):
+    ids = np.asarray(ids, dtype=np.int64)
+    if array.shape[-1] == 0:
+        return np.full(ids.shape, default, dtype=np.float32)
+    valid = (ids >= 0) & (ids < array.shape[-1])
+    safe = np.where(valid, ids, 0)
+    return np.where(valid, array[safe], default)
+
+
+class RiskLookup:
+    """Collapsed float32 risk and volume arrays per table; all that online scoring needs"""
+
+    def __init__(self, risk, volume, prior):
+        self.risk = risk
+        self.volume = volume
+        self.prior = prior
+
+    def lookup(self, name, ids):
+        """Serving risk and volume for IDs of one table; unseen IDs get the prior and zero volume"""
+        return (
+            _gather(self.risk[name], ids, np.float32(self.prior)),
+            _gather(self.volume[name], ids, np.float32(0.0))
+        )
+
+    def multiplier(self, name, ids):
+        """Serving risk relative to the overall laundering rate, as in the EDA risk multipliers"""
+        risk, _ = self.lookup(name, ids)
+        return risk / self.prior if self.prior else np.ones_like(risk)
+
+    def featurize(self, frame):
+        """Table features for a batch of transactions as a float32 DataFrame"""
+        features = {}
+        for name, ids in _table_ids(frame).items():
+            features[f'{name}_risk'], features[f'{name}_volume'] = self.lookup(name, ids)
+        return pd.DataFrame(features, index=frame.index)
+
+    def save(self, models_dir, name='risk_tables'):
+        np.savez(
+            os.path.join(models_dir, f'{name}_serving.npz'),
+            prior=np.float64(self.prior),
+            **{f'{table}_risk': self.risk[table] for table in TABLES},
+            **{f'{table}_volume': self.volume[table] for table in TABLES}
+        )
+
+    @classmethod
+    def load(cls, models_dir, name='risk_tables'):
+        with np.load(os.path.join(models_dir, f'{name}_serving.npz')) as arrays:
+            return cls(
+                {table: arrays[f'{table}_risk'] for table in TABLES},
+                {table: arrays[f'{table}_volume'] for table in TABLES},
+                float(arrays['prior'])
+            )
+
+
+class RiskTables:
+    """Dense per-ID risk and volume tables with per-day history for leakage-free training features"""
+
+    def __init__(self, days, counts, positives, smoothing=100.0, cutoff=None):
+        self.days = list(days)
+        self.counts = counts
+        self.positives = positives
+        self.smoothing = smoothing
+        self.cutoff = cutoff
+
+        total = counts['currency_pair'].sum()
+        self.prior = float(positives['currency_pair'].sum() / total) if total else 0.0
+
+        day_totals = counts['currency_pair'].sum(axis=1)
+        day_cases = positives['currency_pair'].sum(axis=1)
+        self._day_prior = day_cases.cumsum() / np.maximum(day_totals.cumsum(), 1)
+        self._first_day_prior = float(day_cases[0] / max(day_totals[0], 1)) if len(day_totals) else self.prior
+        self._history = {}
+
+        # serving arrays: one gather per transaction
+        risk, volume = {}, {}
+        for name in TABLES:
+            n = counts[name].sum(axis=0)
+            pos = positives[name].sum(axis=0)
+            risk[name] = ((pos + self.smoothing * self.prior) / (n + self.smoothing)).astype(np.float32)
+            volume[name] = np.log1p(n).astype(np.float32)
+        self.serving = RiskLookup(risk, volume, self.prior)
+        self.risk = risk
+        self.volume = volume
+
+    @classmethod
+    def build(cls, source, cutoff=None, smoothing=100.0, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Aggregate per-day counts and laundering cases by bank and currency pair
+
+        Only transactions before `cutoff` (e.g. the end of the training window)
+        are used.
+        """
+        columns = ['Timestamp', 'From Bank', 'To Bank', 'Payment Currency', 'Receiving Currency', TARGET]
+        cutoff_ts = None if cutoff is None else pd.Timestamp(cutoff)
+        partial = {name: [] for name in TABLES}
+
+        for chunk in iter_chunks(source, columns=columns, chunk_size=chunk_size):
+            ts = pd.to_datetime(chunk['Timestamp'])
+            if cutoff_ts is not None:
+                keep = (ts < cutoff_ts).to_numpy()
+                chunk, ts = chunk[keep], ts[keep]
+            day = ts.dt.strftime('%Y-%m-%d').to_numpy()
+            y = chunk[TARGET].to_numpy()
+
+            for name, ids in _table_ids(chunk).items():
+                frame = pd.DataFrame({'day': day, 'id': ids, 'y': y})
+                partial[name].append(frame[frame['id'] >= 0].groupby(['day', 'id'])['y'].agg(['size', 'sum']))
+
+        days = sorted(set().union(*(p.index.get_level_values('day') for parts in partial.values() for p in parts)))
+        day_index = pd.Index(days)
+
+        counts, positives = {}, {}
+        for name in TABLES:
+            parts = [p for p in partial[name] if len(p)]
+            # no rows before the cutoff (or no valid IDs) leaves an empty table that only serves the prior
+            size = len(CURRENCIES) ** 2 if name == 'currency_pair' else 0
+            stats = pd.concat(parts).groupby(level=['day', 'id']).sum() if parts else None
+            if stats is not None and name != 'currency_pair':
+                size = int(stats.index.get_level_values('id').max()) + 1
+
+            counts[name] = np.zeros((len(days), size), dtype=np.int32)
+            positives[name] = np.zeros((len(days), size), dtype=np.int32)
+            if stats is not None:
+                day_codes = day_index.get_indexer(stats.index.get_level_values('day'))
+                ids = stats.index.get_level_values('id').to_numpy()
+                counts[name][day_codes, ids] = stats['size'].to_numpy()
+                positives[name][day_codes, ids] = stats['sum'].to_numpy()
+
+        return cls(days, counts, positives, smoothing, None if cutoff is None else str(cutoff))
+
+    def lookup(self, name, ids):
+        return self.serving.lookup(name, ids)
+
+    def multiplier(self, name, ids):
+        return self.serving.multiplier(name, ids)
+
+    def _cumulative(self, name):
+        if name not in self._history:
+            self._history[name] = (
+                np.cumsum(self.counts[name], axis=0, dtype=np.int64),
+                np.cumsum(self.positives[name], axis=0, dtype=np.int64)
+            )
+        return self._history[name]
+
+    def lookup_history(self, name, ids, day_codes):
+        """Risk and volume using only days strictly before each row's day"""
+        counts, positives = self._cumulative(name)
+        ids = np.asarray(ids, dtype=np.int64)
+        day_codes = np.asarray(day_codes, dtype=np.int64)
+
+        # cumulative row d - 1 holds every day before day d
+        has_history = (day_codes > 0) & (len(self.days) > 0)
+        valid = has_history & (ids >= 0) & (ids < counts.shape[1])
+        n = np.zeros(len(ids))
+        pos = np.zeros(len(ids))
+        if valid.any():
+            n[valid] = counts[day_codes[valid] - 1, ids[valid]]
+            pos[valid] = positives[day_codes[valid] - 1, ids[valid]]
+
+        # time-aware prior; the first day has no history and uses its own base rate
+        prior = np.full(len(ids), self._first_day_prior)
+        prior[has_history] = self._day_prior[day_codes[has_history] - 1]
+
+        risk = (pos + self.smoothing * prior) / (n + self.smoothing)
+        return risk.astype(np.float32), np.log1p(n).astype(np.float32)
+
+    def featurize(self, frame, history=False):
+        """Table features for a batch of transactions as a float32 DataFrame
+
+        With `history=True` (training) each row only sees days before its own;
+        rows on days after the table's last day use the full tables.
+        """
+        if not history:
+            return self.serving.featurize(frame)
+
+        ids = _table_ids(frame)
+        features = {}
+        day = pd.to_datetime(frame['Timestamp']).dt.strftime('%Y-%m-%d').to_numpy()
+        day_codes = np.searchsorted(np.asarray(self.days), day, side='left')
+        for name in TABLES:
+            risk, volume = self.lookup_history(name, ids[name], day_codes)
+            features[f'{name}_risk'] = risk
+            features[f'{name}_volume'] = volume
+
+        return pd.DataFrame(features, index=frame.index)
+
+    def save(self, models_dir, name='risk_tables'):
+        """Per-day history (`{name}.npz`, `{name}.json`) plus the serving arrays (`{name}_serving.npz`)"""
+        self.serving.save(models_dir, name)
+        np.savez_compressed(
+            os.path.join(models_dir, f'{name}.npz'),
+            **{f'{table}_counts': self.counts[table] for table in TABLES},
+            **{f'{table}_positives': self.positives[table] for table in TABLES}
+        )
+        with open(os.path.join(models_dir, f'{name}.json'), 'w') as f:
+            json.dump({
+                'days': self.days,
+                'smoothing': self.smoothing,
+                'cutoff': self.cutoff,
+                'prior': self.prior,
+                'currencies': CURRENCIES,
+                'features': FEATURE_NAMES
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, models_dir, name='risk_tables'):
+        with open(os.path.join(models_dir, f'{name}.json'), 'r') as f:
+            meta = json.load(f)
+        arrays = np.load(os.path.join(models_dir, f'{name}.npz'))
+        counts = {table: arrays[f'{table}_counts'] for table in TABLES}
+        positives = {table: arrays[f'{table}_positives'] for table in TABLES}
+        return cls(meta['days'], counts, positives, meta['smoothing'], meta['cutoff'])
@@ -0,0 +1,171 @@
+"""
+Shadow Scoring
+Score every batch with the champion and, concurrently, with challenger models.
+
+The champion is scored on the caller's thread and its decision is returned
+straight away. Challengers run on a thread pool (LightGBM, XGBoost and CatBoost
+release the GIL during prediction) and their scores and latencies are appended
+to a JSONL log for offline comparison, so they never add latency to the
+critical path. If challengers fall behind, new shadow work is dropped rather
+than queued without bound.
+"""
+
+import glob
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+CHAMPION_FILE = 'calibrated_lightgbm_model.pkl'
+CHALLENGER_PATTERN = 'challenger_*.pkl'
+LOG_FILE = 'shadow_scores.jsonl'
+
+
+def _predict(model, X):
+    start = time.perf_counter()
+    scores = model.predict_proba(X)[:, 1]
+    return scores, (time.perf_counter() - start) * 1000
+
+
+class ShadowScorer:
+    """Champion scoring with asynchronous challenger shadow scoring"""
+
+    def __init__(self, champion, challengers=None, threshold=0.1, log_path=None, max_pending=8):
+        self.champion = champion
+        self.challengers = dict(challengers or {})
+        self.threshold = threshold
+        self.log_path = log_path
+        self.max_pending = max_pending
+
+        self._batch_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.dropped = 0
+        self._executor = (
+            ThreadPoolExecutor(max_workers=len(self.challengers), thread_name_prefix='shadow')
+            if self.challengers else None
+        )
+
+    @classmethod
+    def from_directory(cls, models_dir, threshold=0.1, champion=None, champion_file=CHAMPION_FILE,
+                       challenger_files=None, log_dir=None, **kwargs):
+        """Load the champion and challengers (default: every `challenger_*.pkl`) from `models_dir`
+
+        Pass an already loaded `champion` to avoid unpickling it twice.
+        """
+        if champion is None:
+            champion = joblib.load(os.path.join(models_dir, champion_file))
+
+        if challenger_files is None:
+            paths = sorted(glob.glob(os.path.join(models_dir, CHALLENGER_PATTERN)))
+        else:
+            paths = [os.path.join(models_dir, name) for name in challenger_files]
+        challengers = {
+            os.path.splitext(os.path.basename(path))[0]: joblib.load(path)
+            for path in paths
+        }
+
+        log_dir = log_dir if log_dir is not None else os.path.join(models_dir, 'shadow_logs')
+        log_path = None
+        if challengers:
+            os.makedirs(log_dir, exist_ok=True)
+            log_path = os.path.join(log_dir, LOG_FILE)
+        return cls(champion, challengers, threshold, log_path, **kwargs)
+
+    def _log(self, record):
+        if self.log_path is None:
+            return
+        line = json.dumps(record)
+        with self._lock:
+            with open(self.log_path, 'a') as f:
+                f.write(line + '\n')
+
+    def _record(self, batch_id, name, role, scores, latency_ms):
+        return {
+            'batch_id': batch_id,
+            'logged_at': time.time(),
+            'model': name,
+            'role': role,
+            'n_rows': int(len(scores)),
+            'latency_ms': round(latency_ms, 3),
+            'scores': np.round(scores.astype(np.float64), 6).tolist()
+        }
+
+    def _shadow(self, batch_id, name, model, X):
+        try:
+            scores, latency_ms = _predict(model, X)
+            self._log(self._record(batch_id, name, 'challenger', scores, latency_ms))
+        except Exception as e:
+            self._log({'batch_id': batch_id, 'model': name, 'role': 'challenger', 'error': str(e)})
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def score(self, X):
+        """Champion probabilities for a batch; challengers are scored in the background"""
+        batch_id = next(self._batch_ids)
+
+        accept = False
+        if self._executor is not None:
+            # each shadowed batch queues one task per challenger plus the champion's log record
+            tasks = len(self.challengers) + 1
+            with self._lock:
+                accept = self._pending + tasks <= self.max_pending * tasks
+                if accept:
+                    self._pending += tasks
+                else:
+                    self.dropped += 1
+            if accept:
+                # challengers get their own copy so callers may reuse the input buffer
+                X_shadow = np.array(X, copy=True)
+                for name, model in self.challengers.items():
+                    self._executor.submit(self._shadow, batch_id, name, model, X_shadow)
+
+        scores, latency_ms = _predict(self.champion, X)
+        if accept:
+            # only batches with challenger scores are logged, so every record has a counterpart
+            self._executor.submit(self._log_champion, batch_id, scores, latency_ms)
+        return scores
+
+    def _log_champion(self, batch_id, scores, latency_ms):
+        try:
+            self._log(self._record(batch_id, 'champion', 'champion', scores, latency_ms))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def decide(self, X):
+        """Champion probabilities and threshold decisions for a batch"""
+        scores = self.score(X)
+        return scores, (scores >= self.threshold).astype(np.int8)
+
+    def close(self, wait=True):
+        """Stop the shadow pool, by default after in-flight challengers finish logging"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_shadow_log(log_path):
+    """Shadow log as one row per (batch, model) with latency and score summary"""
+    import pandas as pd
+
+    rows = []
+    with open(log_path, 'r') as f:
+        for line in f:
+            record = json.loads(line)
+            scores = np.asarray(record.pop('scores', []))
+            record['mean_score'] = float(scores.mean()) if len(scores) else None
+            record['scores'] = scores
+            rows.append(record)
+    return pd.DataFrame(rows)
@@ -0,0 +1,226 @@
+"""
+Training Data Builder
+Negative downsampling with importance weights and cached float32 training matrices.
+
+Only ~0.11% of transactions are laundering, so almost all training compute goes
+to easy negatives. The builder keeps every positive, samples negatives per
+stratum (day x payment format x payment currency) and gives each kept negative
+a weight of 1 / sampling rate, so a model trained with `sample_weight` still
+produces calibrated probabilities. The sampled matrices are cached as raw
+float32 files that are memory-mapped on load, so repeated experiments skip
+the 31.9M-row read entirely.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from .data import DEFAULT_CHUNK_SIZE, check_reiterable, iter_chunks, time_mask
+
+TARGET = 'Is Laundering'
+STRATA = ('day', 'Payment Format', 'Payment Currency')
+
+
+def _strata_frame(chunk, strata):
+    columns = {}
+    for col in strata:
+        if col == 'day':
+            columns[col] = pd.to_datetime(chunk['Timestamp']).dt.strftime('%Y-%m-%d').to_numpy()
+        else:
+            columns[col] = chunk[col].astype(str).to_numpy()
+    return pd.DataFrame(columns)
+
+
+def _source_columns(feature_cols, strata, target):
+    columns = [*feature_cols, target, *(c for c in strata if c != 'day')]
+    if 'day' in strata:
+        columns.append('Timestamp')
+    return list(dict.fromkeys(columns))
+
+
+def correct_probabilities(probabilities, negative_rate):
+    """Map probabilities from a model trained on unweighted downsampled data back to the full prior
+
+    Only needed when sample weights were not used; with the builder's weights
+    the model is already calibrated to the original class balance.
+    """
+    p = np.asarray(probabilities, dtype=np.float64)
+    return negative_rate * p / (negative_rate * p + 1 - p)
+
+
+def _open_matrix(path, dtype, shape):
+    # empty files cannot be memory-mapped
+    if shape[0] == 0:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+
+class TrainingMatrix:
+    """Memory-mapped float32 features with labels and sample weights"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, 'metadata.json'), 'r') as f:
+            self.metadata = json.load(f)
+        n_rows = self.metadata['n_rows']
+        n_features = len(self.metadata['feature_names'])
+
+        self.path = path
+        self.feature_names = self.metadata['feature_names']
+        self.X = _open_matrix(os.path.join(path, 'X.f32'), np.float32, (n_rows, n_features))
+        self.y = _open_matrix(os.path.join(path, 'y.i8'), np.int8, (n_rows,))
+        self.sample_weight = _open_matrix(os.path.join(path, 'w.f32'), np.float32, (n_rows,))
+
+    def __len__(self):
+        return len(self.y)
+
+
+class TrainingSetBuilder:
+    """Keeps all positives and a stratified, reweighted sample of negatives"""
+
+    def __init__(self, feature_cols, negative_rate=0.05, min_negatives_per_stratum=50,
+                 strata=STRATA, target=TARGET, time_range=None, seed=42):
+        self.feature_cols = list(feature_cols)
+        self.negative_rate = negative_rate
+        self.min_negatives_per_stratum = min_negatives_per_stratum
+        self.strata = list(strata)
+        self.target = target
+        self.time_range = time_range
+        self.seed = seed
+
+    def config(self):
+        return {
+            'feature_names': self.feature_cols,
+            'negative_rate': self.negative_rate,
+            'min_negatives_per_stratum': self.min_negatives_per_stratum,
+            'strata': self.strata,
+            'target': self.target,
+            'time_range': None if self.time_range is None else [None if t is None else str(t) for t in self.time_range],
+            'seed': self.seed
+        }
+
+    def cache_key(self, source):
+        """Stable key for a (source, config) pair; changes when the source data changes
+
+        Parquet paths are keyed by file size and mtime and DataFrames by a hash
+        of the columns used. Chunk iterables and callables cannot be keyed and
+        raise TypeError.
+        """
+        config = self.config()
+        if isinstance(source, (str, os.PathLike)):
+            stat = os.stat(source)
+            config['source'] = [os.path.abspath(source), stat.st_size, stat.st_mtime]
+        elif isinstance(source, pd.DataFrame):
+            columns = [c for c in _source_columns(self.feature_cols, self.strata, self.target) if c in source.columns]
+            rows = pd.util.hash_pandas_object(source[columns], index=False).to_numpy()
+            config['source'] = [len(source), hashlib.sha1(rows.tobytes()).hexdigest()]
+        else:
+            raise TypeError("Only parquet paths and DataFrames can be cached; use build() for other sources")
+        digest = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()
+        return digest[:16]
+
+    def count_negatives(self, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        """First pass: negatives per stratum, used to set per-stratum sampling rates"""
+        columns = _source_columns([], self.strata, self.target)
+        counts = None
+        for chunk in iter_chunks(source, columns=columns, chunk_size=chunk_size):
+            chunk = chunk[time_mask(chunk, self.time_range) & (chunk[self.target].to_numpy() == 0)]
+            chunk_counts = _strata_frame(chunk, self.strata).value_counts()
+            counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+        return counts if counts is not None else pd.Series(dtype=np.int64)
+
+    def sampling_rates(self, negative_counts):
+        """Per-stratum negative sampling rate; rare strata keep at least `min_negatives_per_stratum`"""
+        floor = self.min_negatives_per_stratum / negative_counts.clip(lower=1)
+        return np.minimum(1.0, np.maximum(self.negative_rate, floor))
+
+    def build(self, source, output_dir, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Sample `source` into `output_dir` and return the memory-mapped TrainingMatrix
+
+        `source` is read twice, so a chunk stream must be passed as a list or
+        as a callable that re-opens it; one-shot iterators raise TypeError. A
+        source with no rows in `time_range` gives an empty matrix.
+        """
+        check_reiterable(source)
+        rates = self.sampling_rates(self.count_negatives(source, chunk_size))
+        rng = np.random.default_rng(self.seed)
+        columns = _source_columns(self.feature_cols, self.strata, self.target)
+
+        os.makedirs(output_dir, exist_ok=True)
+        n_rows = n_positive = n_negative_seen = 0
+        with open(os.path.join(output_dir, 'X.f32'), 'wb') as fx, \
+                open(os.path.join(output_dir, 'y.i8'), 'wb') as fy, \
+                open(os.path.join(output_dir, 'w.f32'), 'wb') as fw:
+            for chunk in iter_chunks(source, columns=columns, chunk_size=chunk_size):
+                chunk = chunk[time_mask(chunk, self.time_range)]
+                y = chunk[self.target].to_numpy().astype(np.int8)
+
+                keys = pd.MultiIndex.from_frame(_strata_frame(chunk, self.strata))
+                row_rates = rates.reindex(keys).fillna(1.0).to_numpy()
+                row_rates = np.where(y == 1, 1.0, row_rates)
+                keep = rng.random(len(chunk)) < row_rates
+
+                X = chunk[self.feature_cols].to_numpy(dtype=np.float32)[keep]
+                fx.write(np.ascontiguousarray(X).tobytes())
+                fy.write(y[keep].tobytes())
+                fw.write((1.0 / row_rates[keep]).astype(np.float32).tobytes())
+
+                n_rows += int(keep.sum())
+                n_positive += int(y.sum())
+                n_negative_seen += int((y == 0).sum())
+
+        metadata = {
+            **self.config(),
+            'n_rows': n_rows,
+            'n_positive': n_positive,
+            'n_negative_seen': n_negative_seen,
+            'n_negative_kept': n_rows - n_positive,
+            'n_strata': int(len(rates))
+        }
+        with open(os.path.join(output_dir, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        return TrainingMatrix(output_dir)
+
+    def load_or_build(self, source, cache_dir, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Reuse a cached matrix for this source and config, building it on first use"""
+        path = os.path.join(cache_dir, self.cache_key(source))
+        if os.path.exists(os.path.join(path, 'metadata.json')):
+            return TrainingMatrix(path)
+        return self.build(source, path, chunk_size)
+
+
+def expected_calibration_error(y_true, probabilities, n_bins=10):
+    """Weighted mean gap between predicted and observed rates over equal-width probability bins"""
+    y_true = np.asarray(y_true, dtype=np.float64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    bins = np.minimum((probabilities * n_bins).astype(np.int64), n_bins - 1)
+
+    predicted = np.bincount(bins, weights=probabilities, minlength=n_bins)
+    observed = np.bincount(bins, weights=y_true, minlength=n_bins)
+    return float(np.abs(predicted - observed).sum() / max(len(y_true), 1))
+
+
+def compare_calibration(y_true, probabilities_by_model, n_bins=10):
+    """Calibration and ranking quality of several models on the same test set
+
+    `probabilities_by_model` maps a model name (e.g. 'Full data',
+    'Downsampled 5%') to its predicted probabilities.
+    """
+    from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+
+    y_true = np.asarray(y_true)
+    results = []
+    for name, probabilities in probabilities_by_model.items():
+        probabilities = np.clip(np.asarray(probabilities, dtype=np.float64), 1e-7, 1 - 1e-7)
+        results.append({
+            'Model': name,
+            'Brier_Score': brier_score_loss(y_true, probabilities),
+            'Log_Loss': log_loss(y_true, probabilities, labels=[0, 1]),
+            'ECE': expected_calibration_error(y_true, probabilities, n_bins),
+            'Mean_Predicted': probabilities.mean(),
+            'Observed_Rate': y_true.mean(),
+            'ROC_AUC': roc_auc_score(y_true, probabilities)
+        })
+    return pd.DataFrame(results)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the dashboard imports `utils` as a top-level package from app/
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app'))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from utils.backtest import _run_fold, build_daily_matrix, sample_training_days
+from utils.training_data import TrainingSetBuilder
+
+
+def make_matrix(tmp_path, n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'Timestamp': pd.Timestamp('2022-09-01') + pd.to_timedelta(rng.integers(0, 4 * 86400, n), unit='s'),
+        'amount': rng.random(n),
+        'Is Laundering': (rng.random(n) < 0.05).astype(int)
+    })
+    return build_daily_matrix(frame, ['amount'], tmp_path)
+
+
+def test_daily_matrix_drops_unmapped_rows_and_keeps_the_window(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1000
+    timestamps = pd.Series(pd.Timestamp('2022-08-30') + pd.to_timedelta(rng.integers(0, 35 * 86400, n), unit='s'))
+    timestamps[::50] = pd.NaT
+    frame = pd.DataFrame({
+        'Timestamp': timestamps,
+        'row': np.arange(n, dtype=float),
+        'Is Laundering': rng.integers(0, 2, n)
+    })
+
+    matrix = build_daily_matrix(frame, ['row'], tmp_path, chunk_size=97)
+
+    expected = frame[(timestamps >= '2022-09-01') & (timestamps < '2022-09-29')]
+    assert matrix.days[0] == '2022-09-01' and matrix.days[-1] == '2022-09-28'
+    assert len(matrix.y) == len(expected)
+    for i, day in enumerate(matrix.days):
+        rows = matrix.rows(i, i + 1)
+        in_day = expected[expected['Timestamp'].dt.strftime('%Y-%m-%d') == day]
+        assert sorted(np.asarray(matrix.X[rows, 0])) == sorted(in_day['row'])
+        assert sorted(np.asarray(matrix.y[rows])) == sorted(in_day['Is Laundering'])
+
+
+def test_sampling_matches_training_set_builder_rates(tmp_path):
+    matrix = make_matrix(tmp_path)
+    y = np.asarray(matrix.y[matrix.rows(0, 3)])
+    negatives = pd.Series([int((matrix.y[matrix.rows(d, d + 1)] == 0).sum()) for d in range(3)])
+    rates = TrainingSetBuilder([], negative_rate=0.2).sampling_rates(negatives).to_numpy()
+
+    X, y_kept, weights = sample_training_days(matrix, 3, 0.2, seed=0)
+
+    assert int(y_kept.sum()) == int(y.sum())
+    assert np.all(weights[y_kept == 1] == 1.0)
+    assert set(np.round(weights[y_kept == 0], 4)) <= set(np.round(1.0 / rates, 4))
+    # reweighted negatives estimate the full count
+    assert abs(weights[y_kept == 0].sum() - negatives.sum()) < 0.15 * negatives.sum()
+    assert len(X) == len(y_kept)
+
+
+def test_undefined_precision_and_recall_are_none(tmp_path):
+    from sklearn.linear_model import LogisticRegression
+
+    matrix = make_matrix(tmp_path)
+
+    result = _run_fold(matrix.path, 2, LogisticRegression, threshold=1.1, negative_rate=1.0, seed=0)
+
+    assert result['alerts'] == 0
+    assert result['precision'] is None
+    assert result['laundering_cases'] > 0 and result['recall'] == 0.0
@@ -0,0 +1,129 @@
+import os
+import warnings
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.batch import PAYMENT_FORMATS, TransactionBatch, score_batches
+from utils.risk_tables import CURRENCIES
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+
+@pytest.fixture(scope='module')
+def scaler():
+    with warnings.catch_warnings():
+        # fitted with an older scikit-learn; StandardScaler's attributes are unchanged
+        warnings.simplefilter('ignore')
+        return joblib.load(os.path.join(MODELS_DIR, 'scaler.pkl'))
+
+
+def legacy_features(timestamp, sender_bank, receiver_bank, amount, currency, payment_format):
+    """Feature dict as the Workbench built it before TransactionBatch"""
+    hour = timestamp.hour
+    day_of_week = timestamp.weekday()
+    is_weekend = 1 if day_of_week >= 5 else 0
+    is_ach = 1 if payment_format == "ACH" else 0
+    is_uk_pound = 1 if currency == "UK Pound" else 0
+    is_bank_1004 = 1 if receiver_bank == 1004 or sender_bank == 1004 else 0
+    in_structuring_range = 1 if 9000 <= amount <= 10000 else 0
+    return {
+        'To Bank': receiver_bank,
+        'From Bank': sender_bank,
+        'Amount Received': amount,
+        'Amount Paid': amount,
+        'hour': hour,
+        'day_of_week': day_of_week,
+        'is_weekend': is_weekend,
+        'is_night': 1 if hour >= 22 or hour < 6 else 0,
+        'is_ach': is_ach,
+        'is_usd': 1 if currency == "US Dollar" else 0,
+        'is_euro': 1 if currency == "Euro" else 0,
+        'is_uk_pound': is_uk_pound,
+        'is_bank_800': 1 if receiver_bank == 800 or sender_bank == 800 else 0,
+        'is_bank_1004': is_bank_1004,
+        'in_structuring_range': in_structuring_range,
+        'is_just_below_threshold': 1 if 9500 <= amount < 10000 else 0,
+        'ach_weekend': is_ach * is_weekend,
+        'uk_pound_structuring': is_uk_pound * in_structuring_range,
+        'amount_zscore': (amount - 5000) / 3000,
+        'risk_score_v2': (is_ach * 3.0 + is_weekend * 1.5 + in_structuring_range * 4.0
+                          + is_bank_1004 * 5.0 + is_uk_pound * 2.0)
+    }
+
+
+def legacy_scaled(scaler, transactions):
+    names = list(scaler.feature_names_in_)
+    return scaler.transform(pd.DataFrame([legacy_features(*tx) for tx in transactions], columns=names))
+
+
+def random_transactions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2022, 9, 1)
+    return [
+        (
+            start + pd.Timedelta(seconds=int(rng.integers(0, 28 * 86400))),
+            int(rng.choice([800, 1004, 12, 70])),
+            int(rng.choice([800, 1004, 3402, 11])),
+            float(np.round(rng.choice([rng.uniform(9000, 10000), rng.uniform(1, 50000)]), 2)),
+            str(rng.choice(CURRENCIES[:4])),
+            str(rng.choice(PAYMENT_FORMATS))
+        )
+        for _ in range(n)
+    ]
+
+
+@pytest.mark.parametrize('transaction', [
+    (datetime(2022, 9, 3, 23, 15), 1004, 800, 9750.0, 'UK Pound', 'ACH'),
+    (datetime(2022, 9, 5, 12, 0), 12, 3402, 10000.0, 'US Dollar', 'Wire'),
+    (datetime(2022, 9, 11, 5, 59), 70, 11, 125000.5, 'Euro', 'Cheque'),
+    (datetime(2022, 9, 14, 6, 0), 800, 1004, 0.01, 'Yen', 'Bitcoin')
+])
+def test_single_transaction_matches_dataframe_path(scaler, transaction):
+    timestamp, sender, receiver, amount, currency, payment_format = transaction
+    batch = TransactionBatch(list(scaler.feature_names_in_), capacity=1, scaler=scaler)
+
+    batch.featurize({
+        'Timestamp': [timestamp],
+        'From Bank': [sender],
+        'To Bank': [receiver],
+        'Amount Paid': [amount],
+        'Payment Currency': [currency],
+        'Payment Format': [payment_format]
+    }).transform()
+
+    np.testing.assert_allclose(batch.X[0], legacy_scaled(scaler, [transaction])[0], rtol=0, atol=3e-6)
+
+
+@pytest.mark.parametrize('encoding', ['strings', 'arrow_dictionary', 'codes'])
+def test_score_batches_over_several_windows(scaler, encoding):
+    pa = pytest.importorskip('pyarrow')
+    transactions = random_transactions(300)
+    timestamp, sender, receiver, amount, currency, payment_format = (list(c) for c in zip(*transactions))
+    if encoding == 'arrow_dictionary':
+        currency = pa.array(currency).dictionary_encode()
+        payment_format = pa.array(payment_format).dictionary_encode()
+    elif encoding == 'codes':
+        currency = np.array([CURRENCIES.index(c) for c in currency])
+        payment_format = np.array([PAYMENT_FORMATS.index(p) for p in payment_format])
+    raw = {
+        'Timestamp': np.array(timestamp, dtype='datetime64[s]'),
+        'From Bank': np.array(sender),
+        'To Bank': np.array(receiver),
+        'Amount Paid': np.array(amount),
+        'Payment Currency': currency,
+        'Payment Format': payment_format
+    }
+    weights = np.random.default_rng(1).normal(size=len(scaler.feature_names_in_))
+    batch = TransactionBatch(list(scaler.feature_names_in_), capacity=128, scaler=scaler)
+
+    windows = [(start, scores.copy()) for start, scores in
+               score_batches(raw, batch, lambda X: np.asarray(X, dtype=np.float64) @ weights)]
+
+    assert [start for start, _ in windows] == [0, 128, 256]
+    assert [len(scores) for _, scores in windows] == [128, 128, 44]
+    expected = legacy_scaled(scaler, transactions) @ weights
+    np.testing.assert_allclose(np.concatenate([s for _, s in windows]), expected, rtol=0, atol=1e-4)
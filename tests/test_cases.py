@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from utils.cases import CaseBuilder
+
+
+def alert(builder, when, sender, receiver, score=0.5, amount=100.0):
+    return builder.add_alert(pd.Timestamp('2022-09-01') + pd.Timedelta(when), sender, receiver, score, amount)
+
+
+def test_each_alert_opens_one_case():
+    builder = CaseBuilder(window='3D')
+    alert(builder, '0h', 'A', 'X')
+    alert(builder, '1h', 'B', 'X')
+
+    cases = builder.to_frame()
+
+    assert len(builder) == 2
+    assert cases['Alerts'].sum() == builder.n_alerts == 2
+    assert sorted(cases['Account']) == ['A', 'B']
+
+
+def test_receiver_role_groups_fan_in():
+    builder = CaseBuilder(window='3D', role='receiver')
+    alert(builder, '0h', 'A', 'X')
+    alert(builder, '1h', 'B', 'X')
+
+    cases = builder.to_frame()
+
+    assert len(builder) == 1
+    assert cases.loc[0, 'Counterparties'] == 2
+
+
+def test_window_edge_and_bridging_merge():
+    builder = CaseBuilder(window='3D')
+    alert(builder, '0D', 'A', 'X', score=0.2)
+    alert(builder, '6D', 'A', 'Y', score=0.9)
+    assert len(builder) == 2
+
+    # exactly one window from both neighbours: joins and merges them
+    alert(builder, '3D', 'A', 'Z', score=0.4)
+
+    cases = builder.to_frame()
+    assert len(builder) == 1
+    assert cases.loc[0, 'Alerts'] == 3
+    assert cases.loc[0, 'Max Score'] == 0.9
+    assert cases.loc[0, 'Counterparties'] == 3
+
+    alert(builder, '9D 1s', 'A', 'X')
+    assert len(builder) == 2
+
+
+def test_unknown_role_is_rejected():
+    with pytest.raises(ValueError):
+        CaseBuilder(role='both')
+
+
+def test_ranking_is_cached_until_an_alert_is_added(monkeypatch):
+    builder = CaseBuilder(window='3D')
+    alert(builder, '0h', 'A', 'X', score=0.4)
+    calls = []
+    rank = builder._rank
+    monkeypatch.setattr(builder, '_rank', lambda *args: calls.append(args) or rank(*args))
+
+    first = builder.to_frame(top=500)
+    first['Max Score'] *= 100
+    again = builder.to_frame(top=500)
+    alert(builder, '1h', 'B', 'X', score=0.9)
+    updated = builder.to_frame(top=500)
+
+    assert len(calls) == 2
+    assert again['Max Score'].tolist() == [0.4]
+    assert updated['Account'].tolist() == ['B', 'A']
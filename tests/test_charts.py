@@ -0,0 +1,100 @@
+import numpy as np
+
+from utils.charts import ChartCache, _operating_point, curve_points, score_histogram
+
+
+class FakeFigure:
+    def __init__(self, size):
+        self.size = size
+
+    def to_json(self):
+        return 'x' * self.size
+
+
+def make_scores(n, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = (rng.random(n) < 0.05).astype(np.int8)
+    scores = np.clip(rng.normal(0.2 + 0.3 * y_true, 0.15), 0, 1).astype(np.float32)
+    return y_true, scores
+
+
+def test_operating_points_are_exact_on_the_full_curve():
+    y_true, scores = make_scores(200_000)
+
+    curves = curve_points(y_true, scores)
+
+    for threshold in (0.05, 0.1, 0.37, 0.8):
+        alerts = scores.astype(np.float64) >= threshold
+        tp = int((alerts & (y_true == 1)).sum())
+        recall, precision = _operating_point(curves, 'recall', 'precision', threshold)
+        fpr, tpr = _operating_point(curves, 'fpr', 'tpr', threshold)
+        assert precision == tp / alerts.sum()
+        assert recall == tpr == tp / y_true.sum()
+        assert fpr == (alerts.sum() - tp) / (y_true == 0).sum()
+
+
+def test_curve_points_on_no_scores():
+    curves = curve_points(np.array([], dtype=np.int8), np.array([], dtype=np.float32))
+
+    assert curves['n_scores'] == 0
+    assert np.isnan(curves['roc_auc']) and np.isnan(curves['average_precision'])
+    assert np.isnan(curves['operating_points']['precision']).all()
+
+
+def test_curve_points_match_sklearn():
+    from sklearn.metrics import average_precision_score, roc_auc_score
+
+    y_true, scores = make_scores(50_000, seed=1)
+    # ties, which sklearn collapses into one threshold
+    scores = np.round(scores, 3)
+
+    curves = curve_points(y_true, scores, max_points=200)
+
+    assert curves['roc_auc'] == roc_auc_score(y_true, scores)
+    assert curves['average_precision'] == average_precision_score(y_true, scores)
+    assert len(curves['fpr']) <= 202 and len(curves['precision']) <= 202
+
+
+def test_score_histogram_counts_each_class():
+    scores = np.array([0.0, 0.004, 0.5, 0.999, 1.0, 0.5])
+    y_true = np.array([0, 0, 1, 0, 1, 0])
+
+    hist = score_histogram(scores, y_true, bins=100)
+
+    assert hist['normal'].sum() == 4 and hist['laundering'].sum() == 2
+    assert hist['normal'][0] == 2 and hist['normal'][50] == 1 and hist['normal'][99] == 1
+    assert hist['laundering'][50] == 1 and hist['laundering'][99] == 1
+    assert len(hist['edges']) == 101
+
+
+def test_chart_cache_evicts_least_recently_used_by_count():
+    cache = ChartCache(max_entries=2, max_bytes=1000)
+    built = []
+
+    def build(name):
+        built.append(name)
+        return FakeFigure(10)
+
+    for name in ('a', 'b', 'a', 'c', 'a', 'b'):
+        cache.get_or_build(name, lambda: build(name))
+
+    # 'b' was least recently used when 'c' arrived, then 'c' when 'b' came back
+    assert built == ['a', 'b', 'c', 'b']
+    assert len(cache) == 2 and cache.evictions == 2
+    assert cache.hits == 2 and cache.misses == 4
+
+
+def test_chart_cache_evicts_by_bytes_and_keys_on_version_and_filters():
+    cache = ChartCache(max_entries=10, max_bytes=100)
+
+    first = cache.get_or_build('hist', lambda: FakeFigure(40), 'v1', threshold=0.1)
+    assert cache.get_or_build('hist', lambda: FakeFigure(40), 'v1', threshold=0.1) is first
+    cache.get_or_build('hist', lambda: FakeFigure(40), 'v1', threshold=0.2)
+    cache.get_or_build('hist', lambda: FakeFigure(40), 'v2', threshold=0.1)
+
+    assert cache.nbytes == 80 and len(cache) == 2
+    assert cache.get(cache.key('hist', 'v1', threshold=0.1)) is None
+
+    # a single oversized entry is still kept
+    cache.get_or_build('big', lambda: FakeFigure(500))
+    assert len(cache) == 1 and cache.nbytes == 500
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dedup import ZERO_KEY, Deduplicator, FingerprintSet, deduplicate, deduplicate_to_parquet
+
+
+def test_zero_fingerprint_is_stored():
+    fingerprints = FingerprintSet(capacity=8)
+
+    assert fingerprints.add([0]).tolist() == [True]
+    assert fingerprints.add([0]).tolist() == [False]
+    assert fingerprints.contains([0]).tolist() == [True]
+    assert len(fingerprints) == 1
+
+
+def test_zero_and_its_stand_in_share_a_slot():
+    fingerprints = FingerprintSet(capacity=8)
+    fingerprints.add([0])
+
+    assert fingerprints.contains([ZERO_KEY]).tolist() == [True]
+
+
+def test_growth_during_add_keeps_every_key():
+    fingerprints = FingerprintSet(capacity=4)
+    # identical low bits: every key probes from the same slot before and after growth
+    keys = (np.arange(1, 2001, dtype=np.uint64) << np.uint64(40)) | np.uint64(3)
+
+    assert fingerprints.add(keys[:3]).all()
+    assert fingerprints.add(keys).tolist() == [False] * 3 + [True] * 1997
+    assert len(fingerprints) == 2000
+    assert len(fingerprints.table) >= 4000
+    assert fingerprints.contains(keys).all()
+    assert not fingerprints.contains(keys + np.uint64(1)).any()
+
+
+def test_repeats_within_a_batch():
+    fingerprints = FingerprintSet(capacity=2)
+    keys = np.array([5, 9, 5, 0, 9, 0], dtype=np.uint64)
+
+    assert fingerprints.add(keys).tolist() == [True, True, False, True, False, False]
+
+
+def test_matches_drop_duplicates_across_chunks():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        'Account': rng.integers(0, 30, 5000).astype(str),
+        'Amount Paid': rng.integers(0, 5, 5000).astype(float)
+    })
+    deduplicator = Deduplicator(FingerprintSet(capacity=2))
+
+    kept = pd.concat(deduplicate(frame, deduplicator, chunk_size=700))
+
+    expected = frame.drop_duplicates()
+    assert kept.index.tolist() == expected.index.tolist()
+    assert deduplicator.report()['duplicates'] == len(frame) - len(expected)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    fingerprints = FingerprintSet(capacity=16)
+    fingerprints.add([0, 1, 2, 3])
+    fingerprints.save(tmp_path / 'index.npy')
+
+    loaded = FingerprintSet.load(tmp_path / 'index.npy')
+
+    assert len(loaded) == 4
+    assert loaded.add([0, 3, 4]).tolist() == [False, False, True]
+
+
+def test_increment_is_deduplicated_against_history(tmp_path):
+    import pyarrow.parquet as pq
+
+    history = pd.DataFrame({'Account': ['a', 'b', 'c'], 'Amount Paid': [10, 20, 30]})
+    increment = pd.DataFrame({'Amount Paid': [20.0, 40.0, 10.0], 'Account': ['b', 'd', 'a']})
+    index = tmp_path / 'history.npy'
+
+    deduplicate_to_parquet(history, tmp_path / 'day1.parquet', history_path=index)
+    report = deduplicate_to_parquet(increment, tmp_path / 'day2.parquet', history_path=index)
+
+    kept = pq.read_table(tmp_path / 'day2.parquet').to_pandas()
+    assert report['duplicates'] == 2
+    assert kept.to_dict('records') == [{'Account': 'd', 'Amount Paid': 40}]
+    assert kept['Amount Paid'].dtype == np.int64
+
+
+def test_mismatched_schema_is_rejected():
+    deduplicator = Deduplicator()
+    deduplicator.process(pd.DataFrame({'a': [1, 2]}))
+
+    with pytest.raises(ValueError):
+        deduplicator.process(pd.DataFrame({'b': [1, 2]}))
+    with pytest.raises(ValueError):
+        deduplicator.process(pd.DataFrame({'a': [1.5, 2.0]}))
+
+
+def test_all_duplicate_increment_writes_an_empty_file(tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    frame = pd.DataFrame({'Account': ['a', 'b'], 'Amount Paid': [10, 20]})
+    index = tmp_path / 'history.npy'
+    output = tmp_path / 'day.parquet'
+    deduplicate_to_parquet(frame, tmp_path / 'history.parquet', history_path=index)
+    output.write_bytes(b'stale')
+
+    report = deduplicate_to_parquet(frame, output, history_path=index)
+
+    table = pq.read_table(output)
+    assert report['rows_kept'] == 0
+    assert table.num_rows == 0
+    assert table.schema.names == ['Account', 'Amount Paid']
+    assert not pa.types.is_null(table.schema.field('Account').type)
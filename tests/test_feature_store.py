@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.feature_store import TIME_BITS, TIME_MASK, FeatureDefinition, FeatureStore, _to_seconds
+
+DEFINITIONS = [
+    FeatureDefinition('sender_volume_7d', 'Account', 'Amount Paid', window='7D', agg='sum'),
+    FeatureDefinition('sender_count_7d', 'Account', window='7D', agg='count'),
+    FeatureDefinition('sender_mean_7d', 'Account', 'Amount Paid', window='7D', agg='mean'),
+    FeatureDefinition('pair_count_prior', ['Account', 'Account.1'], agg='count'),
+]
+
+
+def make_transactions(n=400, seed=0, start='2022-09-01'):
+    rng = np.random.default_rng(seed)
+    # whole-day offsets put many transactions exactly on window edges
+    offsets = rng.integers(0, 20, n) * 86400 + rng.choice([0, 1, 3600], n)
+    return pd.DataFrame({
+        'Timestamp': pd.Timestamp(start) + pd.to_timedelta(np.sort(offsets), unit='s'),
+        'Account': rng.choice(['A', 'B', 'C', 'D'], n),
+        'Account.1': rng.choice(['X', 'Y'], n),
+        'Amount Paid': rng.integers(1, 100, n).astype(float)
+    })
+
+
+def naive_features(history, queries, strict=True):
+    """Window [t - 7D, t) when strict, (t - 7D, t] otherwise"""
+    window = pd.Timedelta('7D')
+    rows = []
+    for _, q in queries.iterrows():
+        t = q['Timestamp']
+        same_sender = history['Account'] == q['Account']
+        if strict:
+            in_window = (history['Timestamp'] >= t - window) & (history['Timestamp'] < t)
+            prior = history['Timestamp'] < t
+        else:
+            in_window = (history['Timestamp'] > t - window) & (history['Timestamp'] <= t)
+            prior = history['Timestamp'] <= t
+        sender = history[same_sender & in_window]
+        pair = same_sender & (history['Account.1'] == q['Account.1']) & prior
+        rows.append({
+            'sender_volume_7d': sender['Amount Paid'].sum(),
+            'sender_count_7d': len(sender),
+            'sender_mean_7d': sender['Amount Paid'].mean() if len(sender) else 0.0,
+            'pair_count_prior': int(pair.sum())
+        })
+    return pd.DataFrame(rows, index=queries.index)
+
+
+@pytest.mark.parametrize('strict', [True, False])
+def test_matches_naive_windows(strict):
+    transactions = make_transactions()
+    store = FeatureStore(DEFINITIONS).materialize(transactions)
+
+    features = store.get_historical_features(transactions, strict=strict)
+
+    expected = naive_features(transactions, transactions, strict=strict)
+    np.testing.assert_allclose(features[expected.columns], expected, rtol=1e-5)
+
+
+def test_window_edges():
+    t0 = pd.Timestamp('2022-09-01 12:00')
+    history = pd.DataFrame({
+        'Timestamp': [t0, t0 + pd.Timedelta('7D')],
+        'Account': ['A', 'A'],
+        'Account.1': ['X', 'X'],
+        'Amount Paid': [10.0, 20.0]
+    })
+    store = FeatureStore(DEFINITIONS).materialize(history)
+    queries = history.iloc[[0, 0, 0, 0]].reset_index(drop=True)
+    queries['Timestamp'] = [t0, t0 + pd.Timedelta('7D'), t0 + pd.Timedelta('7D 1s'), t0 + pd.Timedelta('1s')]
+
+    strict = store.get_historical_features(queries, strict=True)
+    inclusive = store.get_historical_features(queries, strict=False)
+
+    # strict: [t - 7D, t), so the transaction at t itself is never visible
+    assert strict['sender_count_7d'].tolist() == [0, 1, 1, 1]
+    assert strict['sender_volume_7d'].tolist() == [0, 10, 20, 10]
+    # inclusive: (t - 7D, t]
+    assert inclusive['sender_count_7d'].tolist() == [1, 1, 1, 1]
+    assert inclusive['sender_volume_7d'].tolist() == [10, 20, 20, 10]
+
+
+def test_unknown_entity_gets_zero():
+    store = FeatureStore(DEFINITIONS).materialize(make_transactions())
+    query = {'Timestamp': pd.Timestamp('2022-10-01'), 'Account': 'Z', 'Account.1': 'X', 'Amount Paid': 5.0}
+
+    features = store.get_online_features(query)
+
+    assert all(value == 0 for value in features.values())
+
+
+def test_packed_keys_keep_entities_apart():
+    transactions = make_transactions()
+    store = FeatureStore(DEFINITIONS).materialize(transactions)
+    snapshots = store.snapshots[('Account',)]
+
+    codes = snapshots.keys >> TIME_BITS
+    seconds = snapshots.keys & TIME_MASK
+    assert (np.diff(snapshots.keys) > 0).all()
+    assert set(codes.tolist()) == set(range(4))
+    assert seconds.min() == _to_seconds(transactions['Timestamp']).min()
+
+
+@pytest.mark.parametrize('split', [1, 150, 399])
+def test_append_matches_full_materialize(split):
+    transactions = make_transactions()
+    # an increment may introduce new entities and share the boundary timestamp
+    transactions.loc[split:, 'Account'] = transactions.loc[split:, 'Account'].replace('D', 'E')
+    full = FeatureStore(DEFINITIONS).materialize(transactions)
+    incremental = (
+        FeatureStore(DEFINITIONS)
+        .materialize(transactions.iloc[:split])
+        .append(transactions.iloc[split:])
+    )
+
+    expected = full.get_historical_features(transactions)
+    actual = incremental.get_historical_features(transactions)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_append_rejects_older_transactions():
+    transactions = make_transactions()
+    store = FeatureStore(DEFINITIONS).materialize(transactions.iloc[200:])
+
+    with pytest.raises(ValueError):
+        store.append(transactions.iloc[:200])
+
+
+def test_save_and_load_round_trip(tmp_path):
+    transactions = make_transactions()
+    store = FeatureStore(DEFINITIONS).materialize(transactions)
+    store.save(tmp_path / 'store')
+
+    loaded = FeatureStore.load(tmp_path / 'store')
+
+    pd.testing.assert_frame_equal(
+        loaded.get_historical_features(transactions),
+        store.get_historical_features(transactions)
+    )
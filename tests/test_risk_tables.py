@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from utils.risk_tables import TABLES, RiskLookup, RiskTables
+
+
+def make_transactions(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Timestamp': pd.Timestamp('2022-09-01') + pd.to_timedelta(rng.integers(0, 10 * 86400, n), unit='s'),
+        'From Bank': rng.integers(0, 50, n),
+        'To Bank': rng.integers(0, 50, n),
+        'Payment Currency': rng.choice(['US Dollar', 'Euro', 'UK Pound'], n),
+        'Receiving Currency': rng.choice(['US Dollar', 'Euro'], n),
+        'Is Laundering': (rng.random(n) < 0.05).astype(int)
+    })
+
+
+def test_cutoff_before_all_rows_builds_empty_tables():
+    tables = RiskTables.build(make_transactions(), cutoff='2000-01-01')
+
+    assert tables.days == []
+    assert tables.prior == 0.0
+    risk, volume = tables.lookup('from_bank', [1, 2])
+    assert risk.tolist() == [0.0, 0.0] and volume.tolist() == [0.0, 0.0]
+    assert tables.multiplier('to_bank', [3]).tolist() == [1.0]
+
+
+def test_serving_arrays_round_trip(tmp_path):
+    transactions = make_transactions()
+    tables = RiskTables.build(transactions)
+    tables.save(tmp_path)
+
+    serving = RiskLookup.load(tmp_path)
+
+    assert serving.prior == tables.prior
+    for name in TABLES:
+        assert serving.risk[name].dtype == np.float32
+        np.testing.assert_array_equal(serving.risk[name], tables.risk[name])
+    pd.testing.assert_frame_equal(serving.featurize(transactions), tables.featurize(transactions))
+
+
+def test_history_only_uses_earlier_days():
+    transactions = make_transactions()
+    tables = RiskTables.build(transactions, smoothing=10.0)
+
+    features = tables.featurize(transactions, history=True)
+
+    day = transactions['Timestamp'].dt.normalize()
+    row = transactions.index[day > day.min()][0]
+    bank = transactions.loc[row, 'From Bank']
+    earlier = transactions[(day < day[row])]
+    prior = earlier['Is Laundering'].mean()
+    same_bank = earlier[earlier['From Bank'] == bank]
+    expected = (same_bank['Is Laundering'].sum() + 10.0 * prior) / (len(same_bank) + 10.0)
+    assert np.isclose(features.loc[row, 'from_bank_risk'], expected, rtol=1e-5)
+
+
+def test_history_on_empty_tables_returns_the_prior():
+    transactions = make_transactions()
+    tables = RiskTables.build(transactions, cutoff='2000-01-01')
+
+    features = tables.featurize(transactions, history=True)
+
+    assert (features == 0).all().all()
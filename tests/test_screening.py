@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency, f_oneway
+
+from utils.screening import screen_features
+
+
+def make_frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.1).astype(int)
+    with_nan = rng.normal(10, 2, n) + y
+    with_nan[rng.random(n) < 0.2] = np.nan
+    return pd.DataFrame({
+        'Payment Format': np.where(y & (rng.random(n) < 0.5), 'ACH', rng.choice(['ACH', 'Wire', 'Cash'], n)),
+        'is_weekend': rng.integers(0, 2, n),
+        'amount': rng.gamma(2.0, 500.0, n) + 300 * y,
+        'with_nan': with_nan,
+        # variance tiny relative to the mean: fragile without the first-chunk shift
+        'large_offset': 1e9 + rng.normal(0, 1, n) + 0.1 * y,
+        'Is Laundering': y
+    })
+
+
+def test_matches_scipy_on_the_full_frame():
+    df = make_frame()
+    categorical = ['Payment Format', 'is_weekend']
+    numerical = ['amount', 'with_nan', 'large_offset']
+
+    chi2_df, anova_df = screen_features(df, categorical, numerical, chunk_size=317)
+
+    for feat in categorical:
+        chi2_stat, p_value, _, _ = chi2_contingency(pd.crosstab(df[feat], df['Is Laundering']))
+        row = chi2_df.set_index('Feature').loc[feat]
+        assert row['Chi2_Statistic'] == pytest.approx(chi2_stat, rel=1e-9)
+        assert row['P_Value'] == pytest.approx(p_value, rel=1e-6)
+
+    for feat in numerical:
+        group_0 = df[df['Is Laundering'] == 0][feat].dropna()
+        group_1 = df[df['Is Laundering'] == 1][feat].dropna()
+        f_stat, p_value = f_oneway(group_0, group_1)
+        row = anova_df.set_index('Feature').loc[feat]
+        assert row['F_Statistic'] == pytest.approx(f_stat, rel=1e-6)
+        assert row['P_Value'] == pytest.approx(p_value, rel=1e-5, abs=1e-300)
+        assert row['Mean_Normal'] == pytest.approx(group_0.mean(), rel=1e-12)
+        assert row['Mean_Laundering'] == pytest.approx(group_1.mean(), rel=1e-12)
+
+
+def test_first_chunk_without_values_still_sets_the_shift():
+    df = make_frame(seed=1)
+    df.loc[:99, 'large_offset'] = np.nan
+
+    _, anova_df = screen_features(df, numerical_features=['large_offset'], chunk_size=100)
+
+    group_0 = df[df['Is Laundering'] == 0]['large_offset'].dropna()
+    group_1 = df[df['Is Laundering'] == 1]['large_offset'].dropna()
+    assert anova_df.loc[0, 'F_Statistic'] == pytest.approx(f_oneway(group_0, group_1)[0], rel=1e-6)
@@ -0,0 +1,38 @@
+import json
+import threading
+from collections import Counter
+
+import numpy as np
+
+from utils.shadow import ShadowScorer
+
+
+class ConstantModel:
+    def __init__(self, gate=None):
+        self.gate = gate
+
+    def predict_proba(self, X):
+        if self.gate is not None:
+            self.gate.wait()
+        return np.column_stack([1 - X[:, 0], X[:, 0]])
+
+
+def test_queue_stays_bounded_when_challengers_fall_behind(tmp_path):
+    gate = threading.Event()
+    log_path = tmp_path / 'shadow.jsonl'
+    scorer = ShadowScorer(ConstantModel(), {'slow': ConstantModel(gate)}, log_path=str(log_path), max_pending=2)
+
+    X = np.full((3, 2), 0.5)
+    for _ in range(200):
+        assert scorer.score(X).tolist() == [0.5, 0.5, 0.5]
+        assert scorer._executor._work_queue.qsize() <= 2 * 2
+
+    assert scorer.dropped == 198
+    gate.set()
+    scorer.close()
+
+    records = [json.loads(line) for line in open(log_path)]
+    per_batch = Counter(record['batch_id'] for record in records)
+    assert len(per_batch) == 2
+    assert set(per_batch.values()) == {2}
+    assert scorer._pending == 0
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.training_data import TrainingSetBuilder
+
+
+def make_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Timestamp': pd.Timestamp('2022-09-01') + pd.to_timedelta(rng.integers(0, 5 * 86400, n), unit='s'),
+        'amount': rng.random(n),
+        'Payment Format': rng.choice(['ACH', 'Wire'], n),
+        'Payment Currency': 'Euro',
+        'Is Laundering': (rng.random(n) < 0.05).astype(int)
+    })
+
+
+def test_cache_is_keyed_on_dataframe_contents(tmp_path):
+    builder = TrainingSetBuilder(['amount'], negative_rate=0.5, min_negatives_per_stratum=5)
+    large, small = make_frame(5000, 0), make_frame(1000, 1)
+
+    first = builder.load_or_build(large, tmp_path)
+    second = builder.load_or_build(small, tmp_path)
+    again = builder.load_or_build(large.copy(), tmp_path)
+
+    assert len(second.y) < len(first.y)
+    assert again.path == first.path
+
+
+def test_chunk_iterables_are_not_cached(tmp_path):
+    builder = TrainingSetBuilder(['amount'])
+
+    with pytest.raises(TypeError):
+        builder.load_or_build(iter([make_frame(100, 0)]), tmp_path)
+
+
+def test_build_reopens_callable_sources(tmp_path):
+    builder = TrainingSetBuilder(['amount'], negative_rate=0.5, min_negatives_per_stratum=5)
+    frame = make_frame(5000, 0)
+
+    expected = builder.build(frame, tmp_path / 'frame', chunk_size=1000)
+    chunked = builder.build(lambda: iter([frame[:2500], frame[2500:]]), tmp_path / 'chunks', chunk_size=1000)
+    listed = builder.build([frame[:2500], frame[2500:]], tmp_path / 'list', chunk_size=1000)
+
+    assert len(expected) > 0
+    np.testing.assert_array_equal(chunked.y, expected.y)
+    np.testing.assert_array_equal(listed.X, expected.X)
+
+
+def test_build_rejects_one_shot_iterators(tmp_path):
+    builder = TrainingSetBuilder(['amount'])
+    frame = make_frame(100, 0)
+
+    with pytest.raises(TypeError):
+        builder.build(iter([frame[:50], frame[50:]]), tmp_path)
+
+
+def test_build_with_no_rows_in_time_range(tmp_path):
+    builder = TrainingSetBuilder(['amount'], time_range=('2023-01-01', None))
+
+    matrix = builder.build(make_frame(1000, 0), tmp_path)
+
+    assert len(matrix) == 0
+    assert matrix.X.shape == (0, 1)
+    assert matrix.metadata['n_strata'] == 0